@@ -0,0 +1,285 @@
+import numpy as np
+import pandas as pd
+
+from sketches import STREAMING_EXACT_LIMIT, Estimate, HyperLogLog, KLLSketch
+
+# Values counted per text column once it has too many distinct values to count them all
+STREAMING_TOP_VALUES = 1_000
+
+
+# Running count / mean / variance / min / max for one numeric column, with a
+# KLL sketch for its quantiles. Chunks are folded in with Chan's parallel
+# update, so two accumulators built over different parts of a file can be
+# merged without revisiting the rows.
+class MomentAccumulator:
+    kind = 'numeric'
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.kll = KLLSketch(seed=0, exact_limit=STREAMING_EXACT_LIMIT)
+
+    def update(self, values):
+        arr = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        missing = np.isnan(arr)
+        self.nulls += int(missing.sum())
+        arr = arr[~missing]
+        if arr.size == 0:
+            return
+        self.merge(self._batch(arr), nulls=False)
+
+    def _batch(self, arr):
+        batch = type(self)()
+        batch.count = arr.size
+        batch.mean = float(arr.mean())
+        batch.m2 = float(((arr - batch.mean) ** 2).sum())
+        batch.min = float(arr.min())
+        batch.max = float(arr.max())
+        batch.kll = KLLSketch(seed=0, exact_limit=len(arr))
+        batch.kll.update(arr)
+        return batch
+
+    def merge(self, other, nulls=True):
+        if nulls:
+            self.nulls += other.nulls
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.kll.merge(other.kll)
+
+    @property
+    def nbytes(self):
+        return self.kll.nbytes
+
+    @property
+    def std(self):
+        if self.count < 2:
+            return np.nan
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+
+# The moments of a numeric column plus its distinct values, tracked exactly
+# until there are too many to hold, then handed to a HyperLogLog.
+class NumericAccumulator(MomentAccumulator):
+    def __init__(self):
+        super().__init__()
+        self.distinct = np.empty(0)
+        self.hll = None
+
+    def _batch(self, arr):
+        batch = super()._batch(arr)
+        batch.distinct = np.unique(arr)
+        return batch
+
+    def merge(self, other, nulls=True):
+        super().merge(other, nulls)
+        if other.count == 0:
+            return
+        if other.hll is not None:
+            self._switch_to_hll()
+            self.hll.merge(other.hll)
+        elif self.hll is not None:
+            self.hll.update(other.distinct)
+        else:
+            self.distinct = np.union1d(self.distinct, other.distinct)
+            if len(self.distinct) > STREAMING_EXACT_LIMIT:
+                self._switch_to_hll()
+
+    def _switch_to_hll(self):
+        if self.hll is None:
+            # Re-adding values a sketch has already seen does not change it
+            self.hll = HyperLogLog()
+            self.hll.update(self.distinct)
+            self.distinct = np.empty(0)
+
+    def distinct_estimate(self):
+        if self.hll is not None:
+            return self.hll.result()
+        return Estimate(len(self.distinct), 0.0, True)
+
+    @property
+    def unique(self):
+        return self.distinct_estimate().value
+
+    @property
+    def nbytes(self):
+        return super().nbytes + self.distinct.nbytes + (self.hll.nbytes if self.hll is not None else 0)
+
+
+# Running value counts for one non-numeric column. Counts are exact until the
+# column has more than STREAMING_EXACT_LIMIT distinct values; from then on
+# the distinct count comes from a HyperLogLog and only the most frequent
+# values are counted, as a Misra-Gries summary of STREAMING_TOP_VALUES
+# counters: every merge subtracts the next largest count from all of them,
+# so a value's count is low by at most count / (STREAMING_TOP_VALUES + 1)
+# and any value above that share of the rows is kept. freq_error is the sum
+# of everything subtracted so far, a bound on how low any kept count is.
+class CategoricalAccumulator:
+    kind = 'categorical'
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.counts = pd.Series(dtype='int64')
+        self.hll = None
+        self.freq_error = 0
+
+    def update(self, values):
+        self.nulls += int(values.isna().sum())
+        batch = CategoricalAccumulator()
+        batch.counts = values.dropna().astype(str).value_counts()
+        batch.count = int(batch.counts.sum())
+        self.merge(batch, nulls=False)
+
+    def merge(self, other, nulls=True):
+        if nulls:
+            self.nulls += other.nulls
+        self.count += other.count
+        self.freq_error += other.freq_error
+        self.counts = self.counts.add(other.counts, fill_value=0).astype('int64')
+        if other.hll is not None:
+            self._switch_to_hll()
+            self.hll.merge(other.hll)
+        elif self.hll is not None:
+            self.hll.update(other.counts.index.to_series())
+        elif len(self.counts) > STREAMING_EXACT_LIMIT:
+            self._switch_to_hll()
+        if self.hll is not None and len(self.counts) > STREAMING_TOP_VALUES:
+            threshold = self.counts.nlargest(STREAMING_TOP_VALUES + 1).iloc[-1]
+            self.counts = self.counts[self.counts > threshold] - threshold
+            self.freq_error += int(threshold)
+
+    def _switch_to_hll(self):
+        if self.hll is None:
+            self.hll = HyperLogLog()
+            self.hll.update(self.counts.index.to_series())
+
+    def distinct_estimate(self):
+        if self.hll is not None:
+            return self.hll.result()
+        return Estimate(len(self.counts), 0.0, True)
+
+    @property
+    def unique(self):
+        return self.distinct_estimate().value
+
+    @property
+    def nbytes(self):
+        return int(self.counts.memory_usage(index=True, deep=True)) + (self.hll.nbytes if self.hll is not None else 0)
+
+    def top(self):
+        if self.counts.empty:
+            return np.nan, np.nan
+        return self.counts.idxmax(), int(self.counts.max())
+
+
+def _column_kind(values):
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return 'numeric'
+    return 'categorical'
+
+
+# Per-column accumulators for a whole table, fed one chunk at a time. The
+# column kind is fixed by the first chunk that contains the column; update()
+# returns the columns whose values in this chunk are of the other kind (a
+# column of numbers that turns to text further down the file), which the
+# caller must read again with a fixed type. Chunks where a column is entirely
+# missing fit either kind.
+class StreamingSummary:
+    def __init__(self, passes=1):
+        self.rows = 0
+        self.columns = {}
+        # Reads of the file it took, one more for each restart on a type change
+        self.passes = passes
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        changed = []
+        for col in chunk.columns:
+            kind = _column_kind(chunk[col])
+            if col not in self.columns:
+                self.columns[col] = NumericAccumulator() if kind == 'numeric' else CategoricalAccumulator()
+            elif self.columns[col].kind != kind and chunk[col].notna().any():
+                changed.append(col)
+                continue
+            self.columns[col].update(chunk[col])
+        return changed
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, acc in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(acc)
+            else:
+                self.columns[col] = acc
+
+    @property
+    def nbytes(self):
+        return sum(acc.nbytes for acc in self.columns.values())
+
+    def numeric_columns(self):
+        return [col for col, acc in self.columns.items() if acc.kind == 'numeric']
+
+    def categorical_columns(self):
+        return [col for col, acc in self.columns.items() if acc.kind == 'categorical']
+
+    # Same layout as DataFrame.describe(); the quartiles come from the KLL
+    # sketches and are exact until a sketch has had to compact.
+    def numeric_summary(self):
+        stats = {}
+        for col in self.numeric_columns():
+            acc = self.columns[col]
+            q25, q50, q75 = acc.kll.quantiles([0.25, 0.5, 0.75])
+            stats[col] = {
+                'count': float(acc.count),
+                'mean': acc.mean if acc.count else np.nan,
+                'std': acc.std,
+                'min': acc.min if acc.count else np.nan,
+                '25%': q25,
+                '50%': q50,
+                '75%': q75,
+                'max': acc.max if acc.count else np.nan,
+            }
+        return pd.DataFrame(stats)
+
+    # Worst normalized rank error of any quartile in numeric_summary()
+    def quantile_rank_error(self):
+        errors = [self.columns[col].kll.rank_error for col in self.numeric_columns()]
+        return max(errors, default=0.0)
+
+    # Most any 'freq' in categorical_summary() can be below the true count;
+    # zero while every text column is still counted exactly
+    def top_frequency_error(self):
+        errors = [self.columns[col].freq_error for col in self.categorical_columns()]
+        return max(errors, default=0)
+
+    def categorical_summary(self):
+        stats = {}
+        for col in self.categorical_columns():
+            acc = self.columns[col]
+            top, freq = acc.top()
+            stats[col] = {'count': acc.count, 'unique': acc.unique, 'top': top, 'freq': freq}
+        return pd.DataFrame(stats)
+
+    def unique_counts(self):
+        rows = {}
+        for col, acc in self.columns.items():
+            estimate = acc.distinct_estimate()
+            rows[col] = {'Count': estimate.value, '± Std. Error': estimate.error, 'Exact': estimate.exact}
+        unique_df = pd.DataFrame.from_dict(rows, orient='index')
+        if unique_df['Exact'].all():
+            return unique_df[['Count']]
+        return unique_df
+
+    def missing_counts(self):
+        return pd.Series({col: acc.nulls for col, acc in self.columns.items()}, name='Missing')
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+
+# Axes with more categories than this keep their most frequent ones and fold
+# the rest into OTHER_LABEL
+TOP_CATEGORIES = 30
+OTHER_LABEL = 'Other'
+MARGIN_LABEL = 'All'
+
+
+# Integer codes for a column with at most top_n distinct labels (plus Other).
+# Labels come back sorted like pd.crosstab sorts them, Other last. With
+# weights, every value stands for that many rows.
+def factorize_top(values, top_n=TOP_CATEGORIES, weights=None):
+    codes, uniques = pd.factorize(values, sort=True)
+    valid = codes >= 0
+    counts = np.bincount(codes[valid], weights=None if weights is None else weights[valid], minlength=len(uniques))
+    if len(uniques) <= top_n:
+        return codes, pd.Index(uniques), False
+    keep = np.sort(np.argsort(-counts, kind='stable')[:top_n])
+    mapping = np.full(len(uniques), top_n, dtype=np.int64)
+    mapping[keep] = np.arange(top_n)
+    codes = np.where(codes >= 0, mapping[codes], -1)
+    labels = pd.Index(list(uniques[keep]) + [OTHER_LABEL])
+    return codes, labels, True
+
+
+# Rows per combination of values of the columns, as the leaves of a
+# hierarchy (one column: the value counts). Rows with a missing value in any
+# of them are left out, as in px.pie and px.treemap.
+def group_counts(data, columns):
+    return data.groupby(list(columns), observed=True, sort=False).size().reset_index(name='count')
+
+
+# Group counts (the columns plus 'count', as group_counts or an engine's
+# group-by produces them) with every level past its top_n values by row count
+# folded into OTHER_LABEL and the folded groups summed, largest first. Charts
+# are drawn from these few rows instead of one mark per data row. Returns the
+# counts and whether any level was folded.
+def collapse_counts(counts, columns, top_n=TOP_CATEGORIES):
+    columns = list(columns)
+    counts = counts[columns + ['count']]
+    weights = counts['count'].to_numpy(dtype='float64')
+    collapsed = False
+    for col in columns:
+        codes, labels, folded = factorize_top(counts[col], top_n, weights)
+        if folded:
+            counts = counts.assign(**{col: labels.to_numpy(dtype=object)[codes]})
+            collapsed = True
+    if collapsed:
+        counts = counts.groupby(columns, sort=False)['count'].sum().reset_index()
+    counts = counts.sort_values('count', ascending=False, kind='stable').reset_index(drop=True)
+    return counts, collapsed
+
+
+# Two-way frequency table counted in one pass: both columns are factorized to
+# integer codes and the combined code is counted with np.bincount. Rows where
+# either value is missing are left out, as in pd.crosstab.
+class Contingency:
+    def __init__(self, data, row, col, top_n=TOP_CATEGORIES):
+        both = data[row].notna().to_numpy() & data[col].notna().to_numpy()
+        self._count(row, col, data[row][both], data[col][both], top_n)
+
+    # From counts of every (row value, column value) pair seen, as an engine's
+    # group-by produces them; pairs has the two columns plus 'count'
+    @classmethod
+    def from_pair_counts(cls, row, col, pairs, top_n=TOP_CATEGORIES):
+        contingency = cls.__new__(cls)
+        weights = pairs['count'].to_numpy(dtype='float64')
+        contingency._count(row, col, pairs[row], pairs[col], top_n, weights)
+        return contingency
+
+    def _count(self, row, col, row_values, col_values, top_n, weights=None):
+        row_codes, self.row_labels, row_collapsed = factorize_top(row_values, top_n, weights)
+        col_codes, self.col_labels, col_collapsed = factorize_top(col_values, top_n, weights)
+        self.collapsed = row_collapsed or col_collapsed
+        self.row_name = row
+        self.col_name = col
+        n_cols = len(self.col_labels)
+        combined = row_codes.astype(np.int64) * n_cols + col_codes
+        counts = np.bincount(combined, weights=weights, minlength=len(self.row_labels) * n_cols)
+        self.counts = counts.astype(np.int64).reshape(-1, n_cols)
+        self.total = int(self.counts.sum())
+
+    @property
+    def nbytes(self):
+        return self.counts.nbytes
+
+    def _with_margins(self, values):
+        values = np.vstack([values, values.sum(axis=0)])
+        return np.hstack([values, values.sum(axis=1, keepdims=True)])
+
+    def _frame(self, values, margins):
+        index = self.row_labels.rename(self.row_name)
+        columns = self.col_labels.rename(self.col_name)
+        if margins:
+            index = index.append(pd.Index([MARGIN_LABEL])).rename(self.row_name)
+            columns = columns.append(pd.Index([MARGIN_LABEL])).rename(self.col_name)
+        return pd.DataFrame(values, index=index, columns=columns)
+
+    def table(self, margins=True):
+        values = self._with_margins(self.counts) if margins else self.counts
+        return self._frame(values, margins)
+
+    # "count (share%)" for every cell, with the shares derived from the counts
+    # and formatted as whole arrays rather than cell by cell
+    def formatted(self, margins=True):
+        counts = self._with_margins(self.counts) if margins else self.counts
+        shares = counts / self.total * 100 if self.total else np.zeros(counts.shape)
+        text = np.char.add(np.char.add(counts.astype(str), ' ('), np.char.mod('%.2f%%)', shares))
+        return self._frame(text, margins)
+
+
+PIVOT_AGGREGATIONS = ['mean', 'sum', 'count', 'std']
+# Largest number of groups drawn in the pivot heatmap
+MAX_PIVOT_ROWS = 50
+
+
+def _is_numeric(values):
+    return pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+
+
+# Aggregations offered for a value column; non-numeric values can only be counted
+def pivot_aggregations(values):
+    return PIVOT_AGGREGATIONS if _is_numeric(values) else ['count']
+
+
+# Mergeable per-group partials (count, sum and sum of squares) of one value
+# column grouped by one index column, computed with a single groupby. Every
+# aggregation in PIVOT_AGGREGATIONS is derived from them, so switching between
+# mean, sum, count and std does not touch the data again. Values are shifted
+# by a constant before squaring to keep the variance numerically stable.
+class GroupPartials:
+    def __init__(self, data, index, value):
+        self.index_name = index
+        self.value_name = value
+        self.numeric = _is_numeric(data[value])
+        frame = pd.DataFrame({'key': data[index]})
+        if self.numeric:
+            values = data[value].astype('float64')
+            self.shift = float(values.mean()) if values.notna().any() else 0.0
+            shifted = values - self.shift
+            frame['value'] = shifted
+            frame['square'] = shifted * shifted
+            self.partials = frame.groupby('key', observed=True, sort=True).agg(
+                count=('value', 'count'), sum=('value', 'sum'), sumsq=('square', 'sum'))
+        else:
+            self.shift = 0.0
+            frame['value'] = data[value].to_numpy()
+            self.partials = frame.groupby('key', observed=True, sort=True).agg(count=('value', 'count'))
+        self._keep_nonempty()
+
+    # From partials an engine computed, indexed by group and holding count
+    # (and sum and sumsq of the values minus shift when numeric)
+    @classmethod
+    def from_partials(cls, index, value, numeric, shift, partials):
+        group_partials = cls.__new__(cls)
+        group_partials.index_name = index
+        group_partials.value_name = value
+        group_partials.numeric = numeric
+        group_partials.shift = shift
+        group_partials.partials = partials.sort_index()
+        group_partials._keep_nonempty()
+        return group_partials
+
+    def _keep_nonempty(self):
+        self.partials = self.partials[self.partials['count'] > 0]
+        self.partials.index.name = self.index_name
+
+    @property
+    def nbytes(self):
+        return int(self.partials.memory_usage(deep=True).sum())
+
+    def aggregations(self):
+        return PIVOT_AGGREGATIONS if self.numeric else ['count']
+
+    # Fold in partials computed over another part of the same data
+    def merge(self, other):
+        if self.numeric and other.shift != self.shift:
+            other_partials = other.partials.copy()
+            delta = other.shift - self.shift
+            other_partials['sumsq'] += 2 * delta * other_partials['sum'] + delta ** 2 * other_partials['count']
+            other_partials['sum'] += delta * other_partials['count']
+        else:
+            other_partials = other.partials
+        self.partials = self.partials.add(other_partials, fill_value=0)
+
+    def result(self, aggfunc):
+        p = self.partials
+        count = p['count']
+        if aggfunc == 'count':
+            values = count
+        elif aggfunc == 'sum':
+            values = p['sum'] + self.shift * count
+        elif aggfunc == 'mean':
+            values = p['sum'] / count + self.shift
+        elif aggfunc == 'std':
+            variance = (p['sumsq'] - p['sum'] ** 2 / count) / (count - 1)
+            values = np.sqrt(variance.clip(lower=0)).where(count > 1)
+        else:
+            raise ValueError(f"Unsupported aggregation: {aggfunc}")
+        return values.to_frame(self.value_name)
+
+    # The groups with the most rows, in their original order, for drawing
+    def largest_groups(self, table, limit=MAX_PIVOT_ROWS):
+        if len(table) <= limit:
+            return table
+        keep = self.partials['count'].nlargest(limit).index
+        return table[table.index.isin(keep)]
@@ -0,0 +1,455 @@
+# Headless batch reports for generic_eda: runs the analysis sections of the
+# Streamlit app against one or more CSV, Parquet or Feather files without a
+# browser and writes a self-contained HTML report and a JSON report per file.
+#
+#     python batch_report.py data/*.csv --out reports --workers 8
+#
+# Every file is a task on a process pool: its worker parses it once and runs
+# all of its sections, which share intermediates such as the column profile,
+# so files are profiled in parallel and a worker holds one parsed file at a
+# time. Choices the app leaves to widgets take the widget defaults (the first
+# column offered); per-column views cover every column.
+import argparse
+import base64
+import hashlib
+import html
+import io
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import cached_property
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+
+import aggregation
+import clustering
+import correlation
+import dedupe
+import ingest
+import missingness
+import outliers
+import plotting
+import pools
+import profiling
+import selection
+import tokens
+
+NUMERIC_DTYPES = ['number']
+CATEGORICAL_DTYPES = ['object', 'category', 'string']
+# Rows of any one table written to a report
+REPORT_TABLE_ROWS = 200
+PREVIEW_ROWS = 20
+PAIR_PLOT_COLUMNS = 6
+
+
+# One parsed file and the intermediates its sections share, built on first use
+class Dataset:
+    def __init__(self, path, compact=False):
+        self.path = path
+        self.compact = compact
+
+    @cached_property
+    def data(self):
+        file_format, compression = ingest.upload_format(self.path)
+        if file_format == 'csv':
+            data = ingest.read_csv(self.path, compression=compression)
+        else:
+            data = ingest.ColumnarSource(self.path, file_format).read()
+        if self.compact:
+            data, _ = ingest.compact_dtypes(data)
+        return data
+
+    @cached_property
+    def profile(self):
+        return profiling.profile_frame(self.data)
+
+    @cached_property
+    def numeric_columns(self):
+        return self.data.select_dtypes(include=NUMERIC_DTYPES).columns.tolist()
+
+    @cached_property
+    def categorical_columns(self):
+        return self.data.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+
+    @cached_property
+    def pearson(self):
+        return correlation.CorrelationEngine(self.data, 'pearson')
+
+    @cached_property
+    def outlier_scan(self):
+        return outliers.OutlierScan(self.data, outliers.exact_quartiles(self.data, self.numeric_columns))
+
+    @cached_property
+    def null_bitmap(self):
+        return missingness.NullBitmap(self.data)
+
+
+# Sections return a list of (kind, title, payload) blocks, kind being one of
+# 'table', 'figure', 'image' or 'text'
+
+def _dataset_preview(ds):
+    return [('table', f"First {PREVIEW_ROWS} of {len(ds.data):,} rows", ds.data.head(PREVIEW_ROWS))]
+
+
+def _data_info(ds):
+    data = ds.data
+    info = pd.DataFrame({
+        'Dtype': data.dtypes.astype(str),
+        'Non-Null Count': data.notna().sum(),
+        'Memory (KB)': data.memory_usage(index=False, deep=True) / 1024,
+    })
+    return [('text', None, f"{len(data):,} rows x {len(data.columns):,} columns"), ('table', None, info)]
+
+
+def _summary_numeric(ds):
+    return [('table', None, ds.profile.numeric_summary())]
+
+
+def _summary_categorical(ds):
+    summary = ds.profile.categorical_summary()
+    if summary.empty:
+        return [('text', None, "No categorical columns found in the dataset.")]
+    return [('table', None, summary)]
+
+
+def _missing_values(ds):
+    missing = ds.profile.missing_counts()
+    blocks = [('figure', "Missing Values Count",
+               px.bar(x=missing.index, y=missing.values, labels={'x': 'Column', 'y': 'Missing Values'}))]
+    binned = ds.null_bitmap.binned()
+    blocks.append(('figure', "Missing Values Map",
+                   px.imshow(binned, zmin=0, zmax=1, aspect="auto", color_continuous_scale='Greys',
+                             labels={'x': 'Column', 'y': 'Rows', 'color': 'Share Missing'})))
+    nullity_corr = ds.null_bitmap.nullity_correlation()
+    if len(nullity_corr.columns) > 1:
+        blocks.append(('figure', "Nullity Correlation",
+                       px.imshow(nullity_corr, text_auto=".2f", zmin=-1, zmax=1, color_continuous_scale='RdBu')))
+    return blocks
+
+
+def _distribution(ds):
+    return [('figure', col, plotting.histogram_figure(plotting.histogram(ds.data[col], bins='fd'), col))
+            for col in ds.numeric_columns]
+
+
+# Box plots drawn from precomputed quartiles and fences, not from the rows
+def _box_plot(ds):
+    fences = ds.outlier_scan.table()
+    values = ds.data[ds.numeric_columns]
+    fig = go.Figure()
+    for col in ds.numeric_columns:
+        inside = values[col][values[col].between(fences.at[col, 'Lower Fence'], fences.at[col, 'Upper Fence'])]
+        fig.add_trace(go.Box(name=str(col), q1=[fences.at[col, 'Q1']], q3=[fences.at[col, 'Q3']],
+                             median=[ds.profile.quantile(col, 0.5)],
+                             lowerfence=[inside.min()], upperfence=[inside.max()]))
+    return [('figure', None, fig), ('table', "Fences and Outliers", fences)]
+
+
+def _correlation_heatmap(ds):
+    corr = ds.pearson.matrix()
+    fig = px.imshow(corr, text_auto=".2f")
+    fig.update_layout(height=600)
+    return [('figure', None, fig)]
+
+
+def _scatter_plot(ds):
+    if len(ds.numeric_columns) < 2:
+        return [('text', None, "Needs at least two numeric columns.")]
+    x, y = ds.numeric_columns[:2]
+    grid = plotting.density_grid_2d(ds.data, x, y)
+    return [('figure', f"{y} vs {x}", plotting.density_heatmap_figure(grid, x, y))]
+
+
+def _crosstab(ds):
+    if len(ds.categorical_columns) < 2:
+        return [('text', None, "Needs at least two categorical columns.")]
+    row, col = ds.categorical_columns[:2]
+    contingency = aggregation.Contingency(ds.data, row, col)
+    return [('table', f"{row} by {col}", contingency.formatted()),
+            ('figure', None, px.imshow(contingency.table(), text_auto=True, aspect="auto"))]
+
+
+def _unique_values(ds):
+    return [('table', None, ds.profile.unique_counts())]
+
+
+def _pair_plot(ds):
+    columns = ds.numeric_columns[:PAIR_PLOT_COLUMNS]
+    if len(columns) < 2:
+        return [('text', None, "Needs at least two numeric columns.")]
+    indexes, edges, hists = {}, {}, {}
+    for col in columns:
+        indexes[col], edges[col] = plotting.bin_index(ds.data[col])
+        hists[col] = plotting.histogram(ds.data[col], bins=plotting.PAIR_GRID_BINS)
+    grids = plotting.pair_grids(indexes, columns)
+    return [('figure', None, plotting.pair_plot_figure(columns, grids, edges, hists))]
+
+
+def _correlation_analysis(ds):
+    if not ds.numeric_columns:
+        return [('text', None, "No numeric columns found in the dataset.")]
+    var = ds.numeric_columns[0]
+    return [('table', f"Pearson correlation with {var}",
+             ds.pearson.with_column(var).sort_values(ascending=False).to_frame('Correlation'))]
+
+
+def _feature_selection(ds):
+    if not ds.numeric_columns:
+        return [('text', None, "No numeric columns found in the dataset.")]
+    target = ds.numeric_columns[0]
+    scores = selection.feature_scores(ds.data, target)
+    return [('table', f"F-statistic against {target}", scores)]
+
+
+def _duplicates(ds):
+    index = dedupe.DuplicateIndex(ds.data)
+    if index.duplicate_rows == 0:
+        return [('text', None, "No duplicate rows found.")]
+    return [('text', None, f"{index.duplicate_rows:,} duplicate rows in {len(index.counts):,} groups."),
+            ('table', None, index.groups(ds.data))]
+
+
+def _outliers(ds):
+    return [('table', "Outliers per Column", ds.outlier_scan.table())]
+
+
+def _pivot_table(ds):
+    if not ds.categorical_columns or not ds.numeric_columns:
+        return [('text', None, "Needs a categorical and a numeric column.")]
+    index, value = ds.categorical_columns[0], ds.numeric_columns[0]
+    partials = aggregation.GroupPartials(ds.data, index, value)
+    return [('table', f"{agg} of {value} by {index}", partials.result(agg)) for agg in partials.aggregations()]
+
+
+def _wordcloud(ds):
+    blocks = []
+    for col in ds.categorical_columns:
+        frequencies = tokens.token_frequencies(ds.data[col])
+        image = tokens.render_wordcloud(frequencies)
+        if image is not None:
+            blocks.append(('image', col, image))
+    return blocks or [('text', None, "No words found in the text columns.")]
+
+
+def _pie_chart(ds):
+    blocks = []
+    for col in ds.categorical_columns:
+        counts, _ = aggregation.collapse_counts(aggregation.group_counts(ds.data, [col]), [col])
+        blocks.append(('figure', col, px.pie(counts, names=col, values='count')))
+    return blocks or [('text', None, "No categorical columns found in the dataset.")]
+
+
+# Two-level hierarchy over the first two categorical columns, from grouped counts
+def _treemap(ds):
+    path = ds.categorical_columns[:2]
+    if not path:
+        return [('text', None, "No categorical columns found in the dataset.")]
+    counts, _ = aggregation.collapse_counts(aggregation.group_counts(ds.data, path), path)
+    return [('figure', " / ".join(map(str, path)), px.treemap(counts, path=path, values='count'))]
+
+
+def _scatter_3d(ds):
+    if len(ds.numeric_columns) < 3:
+        return [('text', None, "Needs at least three numeric columns.")]
+    x, y, z = ds.numeric_columns[:3]
+    grid = plotting.density_grid_3d(ds.data, x, y, z)
+    return [('figure', f"{x}, {y} and {z}", plotting.density_scatter_3d_figure(grid, x, y, z))]
+
+
+def _kmeans(ds):
+    if len(ds.numeric_columns) < 3:
+        return [('text', None, "Needs at least three numeric columns.")]
+    features = tuple(ds.numeric_columns[:3])
+    result = clustering.ClusterResult(ds.data, features, 3)
+    x, y, z = features
+    fig = px.scatter_3d(result.sample(ds.data), x=x, y=y, z=z, color='Cluster', opacity=0.6)
+    return [('figure', None, fig), ('table', "Centroids", result.centroids)]
+
+
+# Violin, bubble and parallel coordinates plots and feature scaling are left
+# out: they draw every row or only make sense with the app's widgets.
+SECTIONS = {
+    'Dataset': _dataset_preview,
+    'Data Info': _data_info,
+    'Summary Statistics (Numeric)': _summary_numeric,
+    'Summary Statistics (Categorical)': _summary_categorical,
+    'Missing Values': _missing_values,
+    'Distribution Plot': _distribution,
+    'Box Plot': _box_plot,
+    'Correlation Heatmap': _correlation_heatmap,
+    'Scatter Plot': _scatter_plot,
+    'Crosstab Analysis': _crosstab,
+    'Unique Values Count': _unique_values,
+    'Pair Plot': _pair_plot,
+    'Correlation Analysis': _correlation_analysis,
+    'Feature Selection': _feature_selection,
+    'Duplicate Rows': _duplicates,
+    'Outlier Detection': _outliers,
+    'Pivot Table': _pivot_table,
+    'Word Cloud': _wordcloud,
+    'Pie Chart': _pie_chart,
+    'Treemap': _treemap,
+    '3D Scatter Plot': _scatter_3d,
+    '3D K-Means Clustering': _kmeans,
+}
+
+
+def _render_block(kind, title, payload):
+    heading = f"<h3>{html.escape(str(title))}</h3>" if title else ""
+    if kind == 'table':
+        shown = payload.head(REPORT_TABLE_ROWS)
+        note = f"<p>First {REPORT_TABLE_ROWS} of {len(payload):,} rows.</p>" if len(payload) > len(shown) else ""
+        record = {'kind': kind, 'title': title,
+                  'data': json.loads(shown.to_json(orient='split', default_handler=str))}
+        return heading + shown.to_html(border=0, classes='table') + note, record
+    if kind == 'figure':
+        record = {'kind': kind, 'title': title, 'data': json.loads(payload.to_json())}
+        return heading + payload.to_html(full_html=False, include_plotlyjs=False), record
+    if kind == 'image':
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.fromarray(payload).save(buffer, format='PNG')
+        encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+        return heading + f'<img src="data:image/png;base64,{encoded}" style="max-width:100%">', \
+            {'kind': kind, 'title': title}
+    return heading + f"<p>{html.escape(str(payload))}</p>", {'kind': kind, 'title': title, 'data': payload}
+
+
+# Plotly loads most of its machinery on the first figure; doing that when the
+# worker starts keeps it out of the first section's timing
+def _warm_up():
+    px.bar(x=[0], y=[0]).to_html(full_html=False, include_plotlyjs=False)
+
+
+def run_section(ds, section):
+    load_seconds = 0.0
+    start = time.perf_counter()
+    try:
+        # A file that cannot be parsed fails each of its sections, not the batch
+        ds.data
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        parts = [_render_block(*block) for block in SECTIONS[section](ds)]
+        error = None
+    except Exception:
+        parts = []
+        error = traceback.format_exc()
+    seconds = time.perf_counter() - start
+    return {
+        'file': ds.path,
+        'section': section,
+        'html': ''.join(part for part, _ in parts),
+        'blocks': [record for _, record in parts],
+        'seconds': seconds,
+        'load_seconds': load_seconds,
+        'error': error,
+    }
+
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<script type="text/javascript">{plotlyjs}</script>
+<style>body{{font-family:sans-serif;margin:2em}} .table{{border-collapse:collapse;font-size:13px}}
+.table td,.table th{{padding:2px 8px;border-bottom:1px solid #ddd;text-align:right}}
+.error{{color:#b00;white-space:pre-wrap}}</style></head>
+<body><h1>{title}</h1>{timings}{body}</body></html>
+"""
+
+
+# Report names: the input's base name, extension kept so s.csv and s.parquet
+# differ, plus a short hash of the full path when inputs from different
+# directories share a base name
+def report_stems(paths):
+    names = [os.path.basename(path) for path in paths]
+    stems = {}
+    for path, name in zip(paths, names):
+        if names.count(name) > 1:
+            name += '-' + hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=4).hexdigest()
+        stems[path] = name
+    return stems
+
+
+def write_report(path, results, out_dir, stem):
+    timings = pd.DataFrame([{'Section': r['section'], 'Seconds': r['seconds']} for r in results])
+    body = []
+    for r in results:
+        body.append(f"<h2>{html.escape(r['section'])}</h2>")
+        if r['error']:
+            body.append(f"<pre class=\"error\">{html.escape(r['error'])}</pre>")
+        body.append(r['html'])
+    load_seconds = max((r['load_seconds'] for r in results), default=0.0)
+    page = _PAGE.format(title=html.escape(os.path.basename(path)), plotlyjs=get_plotlyjs(),
+                        timings=f"<p>Parsed in {load_seconds:.2f} s.</p>" + timings.to_html(border=0, classes='table',
+                                                                                          index=False),
+                        body=''.join(body))
+    html_path = os.path.join(out_dir, f"{stem}.html")
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    report = {
+        'file': path,
+        'load_seconds': load_seconds,
+        'sections': [{key: r[key] for key in ('section', 'seconds', 'error', 'blocks')} for r in results],
+    }
+    json_path = os.path.join(out_dir, f"{stem}.json")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, default=str)
+    return html_path, json_path
+
+
+# Every section of one file, in one worker: the file is parsed once, its
+# sections share the parse and intermediates, and the dataset is dropped
+# when the last section is done
+def run_file(path, sections, compact=False):
+    ds = Dataset(path, compact)
+    return [run_section(ds, section) for section in sections]
+
+
+# Run every file on a process pool and write its report as soon as its
+# sections are done
+def run_batch(paths, out_dir, sections=None, compact=False, workers=None):
+    sections = sections or list(SECTIONS)
+    # The same file named twice is profiled once
+    paths = list({os.path.abspath(path): path for path in paths}.values())
+    stems = report_stems(paths)
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                             mp_context=pools.process_context(), initializer=_warm_up) as pool:
+        futures = {pool.submit(run_file, path, sections, compact): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            results = future.result()
+            for result in results:
+                status = 'failed' if result['error'] else f"{result['seconds']:.2f} s"
+                print(f"{os.path.basename(path)}: {result['section']} ({status})", flush=True)
+            written.append(write_report(path, results, out_dir, stems[path]))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write HTML and JSON EDA reports for CSV, Parquet or Feather files.")
+    parser.add_argument('files', nargs='*', help="CSV (optionally .gz or .zst), Parquet or Feather files to profile")
+    parser.add_argument('--out', default='reports', help="output directory (default: reports)")
+    parser.add_argument('--sections', nargs='+', choices=list(SECTIONS), metavar='SECTION',
+                        help="sections to run (default: all)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--compact', action='store_true', help="compact column types after parsing")
+    parser.add_argument('--list-sections', action='store_true', help="print the section names and exit")
+    args = parser.parse_args(argv)
+    if args.list_sections:
+        print('\n'.join(SECTIONS))
+        return
+    if not args.files:
+        parser.error("no input files")
+    for html_path, json_path in run_batch(args.files, args.out, args.sections, args.compact, args.workers):
+        print(f"wrote {html_path} and {json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# Benchmark of the generic_eda dataframe engines: times every engine on the
+# same operations over the same CSV file (parse, describe, correlation,
+# crosstab, pivot table, duplicate rows and the conversion to pandas) and
+# checks that their results agree.
+#
+#     python benchmark_engines.py data/large.csv --repeat 3
+#     python benchmark_engines.py --rows 2000000
+#
+# Without a file, a synthetic CSV with numeric and categorical columns is
+# generated first. Each timing is the best of --repeat runs.
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import engines
+
+SYNTHETIC_ROWS = 1_000_000
+SYNTHETIC_CATEGORIES = [5, 50, 1000]
+
+
+def synthetic_csv(path, rows=SYNTHETIC_ROWS, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({f'x{i}': rng.normal(size=rows) for i in range(6)})
+    frame.loc[rng.choice(rows, rows // 50, replace=False), 'x0'] = np.nan
+    frame['n'] = rng.integers(0, 100, rows)
+    for i, categories in enumerate(SYNTHETIC_CATEGORIES):
+        frame[f'c{i}'] = np.char.add('v', rng.integers(0, categories, rows).astype(str))
+    frame.to_csv(path, index=False)
+    return path
+
+
+def _best_of(function, repeat):
+    best, result = np.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# The operations benchmarked, each a function of (engine, native frame, columns)
+# returning a pandas view that can be compared across engines
+OPERATIONS = {
+    'describe': lambda engine, frame, cols: engine.profile(frame).numeric_summary(),
+    'corr': lambda engine, frame, cols: engine.correlation(frame, 'pearson').matrix(),
+    'crosstab': lambda engine, frame, cols: engine.contingency(frame, cols['row'], cols['col']).table(),
+    'pivot_table': lambda engine, frame, cols: engine.group_partials(frame, cols['row'], cols['value']).result('mean'),
+    'duplicated': lambda engine, frame, cols: engine.duplicates(frame).duplicate_rows,
+    'to_pandas': lambda engine, frame, cols: engine.to_pandas(frame),
+}
+
+
+def _same(left, right):
+    if isinstance(left, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(left, right, check_dtype=False)
+        except AssertionError:
+            return False
+        return True
+    return left == right
+
+
+def _columns(schema):
+    categorical = schema.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+    numeric = schema.select_dtypes(include=['number']).columns.tolist()
+    if len(categorical) < 2 or not numeric:
+        raise SystemExit("The benchmark needs two categorical columns and one numeric column.")
+    return {'row': categorical[0], 'col': categorical[1], 'value': numeric[0]}
+
+
+# Seconds per operation and engine, with whether every engine agreed with the first
+def run_benchmark(path, engine_names=None, repeat=3):
+    engine_names = engine_names or engines.available_engines()
+    timings = {}
+    results = {}
+    columns = None
+    for name in engine_names:
+        engine = engines.get_engine(name)
+        seconds, frame = _best_of(lambda: engine.read_csv(path), repeat)
+        timings[('read_csv', name)] = seconds
+        if columns is None:
+            columns = _columns(engine.schema(frame))
+        for operation, function in OPERATIONS.items():
+            seconds, result = _best_of(lambda: function(engine, frame, columns), repeat)
+            timings[(operation, name)] = seconds
+            results[(operation, name)] = result
+    table = pd.Series(timings).unstack()[engine_names]
+    table = table.loc[['read_csv'] + list(OPERATIONS)]
+    first = engine_names[0]
+    table['Agree'] = [operation == 'read_csv' or all(_same(results[(operation, first)], results[(operation, name)])
+                                                     for name in engine_names[1:])
+                      for operation in table.index]
+    if 'pandas' in engine_names:
+        for name in engine_names:
+            if name != 'pandas':
+                table[f'{name} speedup'] = table['pandas'] / table[name]
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the generic_eda dataframe engines on one CSV file.")
+    parser.add_argument('file', nargs='?', help="CSV file to benchmark (default: a generated one)")
+    parser.add_argument('--rows', type=int, default=SYNTHETIC_ROWS, help="rows of the generated CSV")
+    parser.add_argument('--engines', nargs='+', choices=engines.available_engines(), metavar='ENGINE',
+                        help="engines to compare (default: all installed)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per operation, best one kept")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = args.file or synthetic_csv(os.path.join(scratch, 'synthetic.csv'), rows=args.rows)
+        table = run_benchmark(path, args.engines, args.repeat)
+    print(f"{os.path.basename(path)}, best of {args.repeat} runs (seconds):")
+    print(table.to_string(float_format=lambda value: f"{value:.3f}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+from pools import process_context
+
+# Above this many rows K-Means switches to mini-batch fitting
+MINIBATCH_ROWS = 100_000
+MINIBATCH_SIZE = 4096
+# Rows used per k in the elbow / silhouette sweep, and for silhouette scoring
+SWEEP_SAMPLE_ROWS = 200_000
+SILHOUETTE_SAMPLE_ROWS = 10_000
+PLOT_SAMPLE_ROWS = 5_000
+PREDICT_BLOCK_ROWS = 1_000_000
+
+
+def feature_matrix(data, columns):
+    columns = list(dict.fromkeys(columns))
+    values = data[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    rows = np.flatnonzero(np.isfinite(values).all(axis=1))
+    return columns, values[rows], rows
+
+
+def _model(k, rows, seed=42):
+    if rows > MINIBATCH_ROWS:
+        return MiniBatchKMeans(n_clusters=k, random_state=seed, batch_size=MINIBATCH_SIZE, n_init=3)
+    return KMeans(n_clusters=k, random_state=seed)
+
+
+# Cluster assignment for the complete rows of the chosen columns. Large inputs
+# are fitted with MiniBatchKMeans and labelled block by block.
+class ClusterResult:
+    def __init__(self, data, columns, k):
+        self.columns, matrix, self.rows = feature_matrix(data, columns)
+        model = _model(k, len(matrix))
+        model.fit(matrix)
+        self.labels = np.concatenate([
+            model.predict(matrix[start:start + PREDICT_BLOCK_ROWS])
+            for start in range(0, len(matrix), PREDICT_BLOCK_ROWS)
+        ]).astype(np.int32) if len(matrix) else np.empty(0, dtype=np.int32)
+        self.centroids = pd.DataFrame(model.cluster_centers_, columns=self.columns)
+        self.centroids['Cluster'] = np.arange(k).astype(str)
+        self.centroids['Size'] = np.bincount(self.labels, minlength=k)
+        self.inertia = float(model.inertia_)
+        self.minibatch = isinstance(model, MiniBatchKMeans)
+
+    @property
+    def nbytes(self):
+        return self.labels.nbytes + self.rows.nbytes
+
+    # Up to `size` rows drawn from every cluster in proportion to its size, with
+    # at least a few from each so small clusters stay visible.
+    def sample(self, data, size=PLOT_SAMPLE_ROWS, seed=0):
+        rng = np.random.default_rng(seed)
+        picked = []
+        for cluster, count in enumerate(self.centroids['Size']):
+            members = np.flatnonzero(self.labels == cluster)
+            take = min(count, max(20, int(size * count / max(len(self.labels), 1))))
+            picked.append(rng.choice(members, take, replace=False))
+        picked = np.sort(np.concatenate(picked)) if picked else np.empty(0, dtype=np.int64)
+        sample = data.iloc[self.rows[picked]][self.columns].copy()
+        sample['Cluster'] = self.labels[picked].astype(str)
+        return sample
+
+
+# The sweep workers attach to the parent's shared-memory feature matrix once
+# and reuse it for every k instead of receiving a pickled copy per task.
+_shared = {}
+
+
+def _attach(name, shape, dtype):
+    block = shared_memory.SharedMemory(name=name)
+    _shared['block'] = block
+    _shared['matrix'] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _score_k(k):
+    matrix = _shared['matrix']
+    model = _model(k, len(matrix))
+    labels = model.fit_predict(matrix)
+    silhouette = np.nan
+    if 1 < len(np.unique(labels)) < len(matrix):
+        silhouette = silhouette_score(matrix, labels, sample_size=min(SILHOUETTE_SAMPLE_ROWS, len(matrix)),
+                                      random_state=0)
+    return k, float(model.inertia_), float(silhouette)
+
+
+# Inertia (elbow) and silhouette score for every k, one k per worker process.
+# The feature matrix, sampled to SWEEP_SAMPLE_ROWS, lives in shared memory.
+def sweep_k(data, columns, ks, max_workers=None, seed=0):
+    _, matrix, _ = feature_matrix(data, columns)
+    if len(matrix) > SWEEP_SAMPLE_ROWS:
+        rng = np.random.default_rng(seed)
+        matrix = matrix[np.sort(rng.choice(len(matrix), SWEEP_SAMPLE_ROWS, replace=False))]
+    ks = [k for k in ks if k < len(matrix)]
+    block = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+    try:
+        np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=block.buf)[:] = matrix
+        max_workers = min(max_workers or os.cpu_count() or 1, max(len(ks), 1))
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=process_context(),
+                                 initializer=_attach, initargs=(block.name, matrix.shape, matrix.dtype)) as pool:
+            results = list(pool.map(_score_k, ks))
+    finally:
+        block.close()
+        block.unlink()
+    return pd.DataFrame(results, columns=['k', 'Inertia', 'Silhouette'])
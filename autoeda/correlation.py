@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+
+# Column-standardized copy of a numeric matrix with missing entries zeroed,
+# plus the presence mask. Pearson correlation is shift and scale invariant, so
+# products of these give the same coefficients as the raw values but with far
+# less cancellation.
+class _Standardized:
+    def __init__(self, matrix):
+        present = ~np.isnan(matrix)
+        self.has_nulls = not present.all()
+        counts = present.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(present, matrix, 0.0).sum(axis=0) / counts
+            centered = np.where(present, matrix - means, 0.0)
+            scale = np.sqrt((centered ** 2).sum(axis=0) / counts)
+            scale[~(scale > 0)] = np.nan
+            self.z = centered / scale
+        self.z[~present] = 0.0
+        self.mask = present.astype('float64')
+        self.rows = len(matrix)
+
+    @property
+    def nbytes(self):
+        return self.z.nbytes + self.mask.nbytes
+
+    # Full matrix: a single Z'Z product when nothing is missing, otherwise the
+    # pairwise-complete sums, each one more matrix product.
+    def matrix(self):
+        z = self.z
+        products = z.T @ z
+        if not self.has_nulls:
+            return products / self.rows
+        m = self.mask
+        pairs = m.T @ m
+        sums = z.T @ m
+        squares = (z * z).T @ m
+        return _pairwise(pairs, products, sums, sums.T, squares, squares.T)
+
+    # One column against all others as matrix-vector products
+    def vector(self, j):
+        z = self.z
+        products = z.T @ z[:, j]
+        if not self.has_nulls:
+            return products / self.rows
+        m = self.mask
+        pairs = m.T @ m[:, j]
+        sums_other = z.T @ m[:, j]
+        sums_self = m.T @ z[:, j]
+        squares_other = (z * z).T @ m[:, j]
+        squares_self = m.T @ (z[:, j] ** 2)
+        return _pairwise(pairs, products, sums_other, sums_self, squares_other, squares_self)
+
+
+def _pairwise(n, sxy, sx, sy, sxx, syy):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        numerator = n * sxy - sx * sy
+        denominator = np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+        result = numerator / denominator
+    result[n < 2] = np.nan
+    return np.clip(result, -1.0, 1.0)
+
+
+def numeric_columns(data):
+    return [col for col in data.columns
+            if pd.api.types.is_numeric_dtype(data[col]) and not pd.api.types.is_bool_dtype(data[col])]
+
+
+# Pearson or Spearman correlations over the numeric columns of a frame. The
+# standardized matrix (rank-transformed first for Spearman) is built once and
+# cached with the upload, so the heatmap and single-variable views are just
+# matrix products on every rerun. Spearman ranks each column once over all its
+# non-missing values; with missing values pandas re-ranks per pair instead,
+# so results can differ slightly in that case.
+class CorrelationEngine:
+    def __init__(self, data, method='pearson'):
+        method = method.lower()
+        if method not in ('pearson', 'spearman'):
+            raise ValueError(f"Unsupported correlation method: {method}")
+        self.method = method
+        self.columns = numeric_columns(data)
+        values = data[self.columns]
+        if method == 'spearman':
+            values = values.rank(method='average')
+        self._prepared = _Standardized(values.to_numpy(dtype='float64', na_value=np.nan))
+
+    # From a float matrix an engine assembled (already ranked for Spearman),
+    # one column per name in columns and NaN for missing values
+    @classmethod
+    def from_matrix(cls, columns, matrix, method='pearson'):
+        engine = cls.__new__(cls)
+        engine.method = method
+        engine.columns = list(columns)
+        engine._prepared = _Standardized(matrix)
+        return engine
+
+    @property
+    def nbytes(self):
+        return self._prepared.nbytes
+
+    def matrix(self):
+        corr = self._prepared.matrix()
+        np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1.0))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def with_column(self, column):
+        j = self.columns.index(column)
+        corr = self._prepared.vector(j)
+        if not np.isnan(corr[j]):
+            corr[j] = 1.0
+        return pd.Series(corr, index=self.columns, name=column)
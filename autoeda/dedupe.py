@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# Largest number of duplicate groups returned for display
+MAX_DUPLICATE_GROUPS = 1000
+# Rows hashed at a time when building MinHash signatures
+MINHASH_CHUNK_ROWS = 100_000
+MINHASH_PERMUTATIONS = 64
+NEAR_DUPLICATE_THRESHOLD = 0.8
+SHINGLE_PATTERN = r"\w+"
+
+# Odd multiplier used to fold the r values of one band into a bucket key
+_BAND_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+# One 64-bit hash per row over all of its values, computed column-wise by
+# pandas. Two rows get the same fingerprint when all their values are equal
+# (missing values included); unequal rows collide with negligible probability.
+def row_fingerprints(data):
+    return pd.util.hash_pandas_object(data, index=False).to_numpy()
+
+
+# Rows sharing a fingerprint, summarized as groups: the first row of every
+# group and how often it occurs. Built once per upload from the fingerprints,
+# so the frame itself is not compared row by row.
+class DuplicateIndex:
+    def __init__(self, data):
+        fingerprints = row_fingerprints(data)
+        _, first, counts = np.unique(fingerprints, return_index=True, return_counts=True)
+        self._summarize(first, counts, len(data))
+
+    # From the first row and row count of every distinct row, as an engine's
+    # group-by over all columns produces them
+    @classmethod
+    def from_groups(cls, first, counts, rows):
+        index = cls.__new__(cls)
+        index._summarize(np.asarray(first, dtype=np.int64), np.asarray(counts, dtype=np.int64), rows)
+        return index
+
+    # Keeps the repeated groups, largest first
+    def _summarize(self, first, counts, rows):
+        repeated = counts > 1
+        order = np.lexsort((first[repeated], -counts[repeated]))
+        self.first_rows = first[repeated][order]
+        self.counts = counts[repeated][order]
+        self.duplicate_rows = int((self.counts - 1).sum())
+        self.rows = rows
+
+    @property
+    def nbytes(self):
+        return self.first_rows.nbytes + self.counts.nbytes
+
+    # One representative row per group with its Count, largest groups first
+    def groups(self, data, limit=MAX_DUPLICATE_GROUPS):
+        shown = data.iloc[self.first_rows[:limit]].copy()
+        shown.insert(0, 'Count', self.counts[:limit])
+        return shown
+
+
+def _text_columns(data):
+    columns = data.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+    return columns or data.columns.tolist()
+
+
+def _row_text(data, columns):
+    values = data[columns].astype(str).where(data[columns].notna(), '')
+    text = values.iloc[:, 0]
+    if len(columns) > 1:
+        text = text.str.cat([values[col] for col in columns[1:]], sep=' ')
+    return text.str.lower()
+
+
+# Hashes of the distinct words of every text, as parallel (text, hash) arrays
+def _shingles(texts):
+    words = pd.Series(texts).str.findall(SHINGLE_PATTERN).explode().dropna()
+    frame = pd.DataFrame({'text': words.index.to_numpy(dtype=np.int64), 'word': words.to_numpy()})
+    frame = frame.drop_duplicates()
+    return frame['text'].to_numpy(), pd.util.hash_array(frame['word'].to_numpy(dtype=object))
+
+
+# b bands of r rows (b * r == permutations) whose LSH threshold
+# (1 / b) ** (1 / r) is closest to the requested similarity
+def band_layout(threshold, permutations=MINHASH_PERMUTATIONS):
+    layouts = [(permutations // r, r) for r in range(1, permutations + 1) if permutations % r == 0]
+    return min(layouts, key=lambda layout: abs((1 / layout[0]) ** (1 / layout[1]) - threshold))
+
+
+# Rows whose word sets are similar (Jaccard similarity around `threshold` or
+# above), found with MinHash signatures and locality-sensitive hashing. Each
+# chunk of rows is reduced to one bucket key per band; rows sharing any bucket
+# are joined into a group, so only bands x rows keys are ever held in memory.
+class NearDuplicates:
+    def __init__(self, data, threshold=NEAR_DUPLICATE_THRESHOLD, columns=None,
+                 permutations=MINHASH_PERMUTATIONS, chunk_rows=MINHASH_CHUNK_ROWS, seed=1):
+        self.columns = columns or _text_columns(data)
+        self.threshold = threshold
+        self.bands, band_rows = band_layout(threshold, permutations)
+        rng = np.random.default_rng(seed)
+        # Multiply-add hashes over 64-bit words, one per permutation
+        a = rng.integers(0, 2 ** 63, permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        b = rng.integers(0, 2 ** 63, permutations, dtype=np.uint64)
+        self.rows = len(data)
+        keys = np.zeros((self.rows, self.bands), dtype=np.uint64)
+        has_words = np.zeros(self.rows, dtype=bool)
+        for start in range(0, self.rows, chunk_rows):
+            # Repeated texts are hashed once and share their bucket keys
+            codes, texts = pd.factorize(_row_text(data.iloc[start:start + chunk_rows], self.columns))
+            owners, hashes = _shingles(texts)
+            if not len(owners):
+                continue
+            order = np.argsort(owners, kind='stable')
+            owners, hashes = owners[order], hashes[order]
+            starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+            # Minimum of every hash function over each text's words, one
+            # permutation at a time to keep memory at one value per word
+            signatures = np.empty((len(starts), permutations), dtype=np.uint64)
+            for j in range(permutations):
+                signatures[:, j] = np.minimum.reduceat(hashes * a[j] + b[j], starts)
+            banded = signatures.reshape(len(starts), self.bands, band_rows)
+            mix = _BAND_MIX ** np.arange(band_rows, dtype=np.uint64)
+            text_keys = np.zeros((len(texts), self.bands), dtype=np.uint64)
+            text_keys[owners[starts]] = (banded * mix).sum(axis=2, dtype=np.uint64)
+            text_words = np.zeros(len(texts), dtype=bool)
+            text_words[owners[starts]] = True
+            keys[start:start + len(codes)] = text_keys[codes]
+            has_words[start:start + len(codes)] = text_words[codes]
+        self.labels, self.counts = self._components(keys, has_words)
+
+    # Every row is linked to the first row sharing its bucket in any band;
+    # connected components of that graph are the near-duplicate groups. Rows
+    # without any words are left out.
+    def _components(self, keys, has_words):
+        rows = np.flatnonzero(has_words)
+        targets = []
+        for band in range(self.bands):
+            codes, uniques = pd.factorize(keys[rows, band])
+            first = np.empty(len(uniques), dtype=np.int64)
+            first[codes[::-1]] = rows[::-1]
+            targets.append(first[codes])
+        sources = np.tile(rows, self.bands)
+        targets = np.concatenate(targets) if targets else np.empty(0, dtype=np.int64)
+        linked = sources != targets
+        graph = coo_matrix((np.ones(linked.sum(), dtype=np.int8), (sources[linked], targets[linked])),
+                           shape=(self.rows, self.rows))
+        _, components = connected_components(graph, directed=False)
+        _, inverse, counts = np.unique(components, return_inverse=True, return_counts=True)
+        grouped = counts[inverse] > 1
+        _, labels = np.unique(inverse[grouped], return_inverse=True)
+        group_labels = np.full(self.rows, -1, dtype=np.int64)
+        group_labels[grouped] = labels
+        return group_labels, np.bincount(labels)
+
+    @property
+    def nbytes(self):
+        return self.labels.nbytes + self.counts.nbytes
+
+    @property
+    def near_duplicate_rows(self):
+        return int((self.labels >= 0).sum())
+
+    # First row of every group with the group size, largest groups first
+    def groups(self, data, limit=MAX_DUPLICATE_GROUPS):
+        grouped = np.flatnonzero(self.labels >= 0)
+        _, first = np.unique(self.labels[grouped], return_index=True)
+        first_rows = grouped[first]
+        sizes = self.counts[self.labels[first_rows]]
+        order = np.lexsort((first_rows, -sizes))[:limit]
+        shown = data.iloc[first_rows[order]].copy()
+        shown.insert(0, 'Count', sizes[order])
+        return shown
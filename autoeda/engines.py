@@ -0,0 +1,286 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import aggregation
+import correlation
+import dedupe
+import ingest
+import paging
+import profiling
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    HAS_ARROW_ENGINE = True
+except ImportError:
+    HAS_ARROW_ENGINE = False
+
+# Threads the Arrow engine spreads per-column work over
+ENGINE_THREADS = os.cpu_count() or 1
+# Name of the row-position column added for group-bys that report first rows
+_ROW_COLUMN = '__row__'
+# Arrow kernels of the dataset viewer's row filters
+_ARROW_COMPARISONS = {'==': 'equal', '!=': 'not_equal', '<': 'less', '<=': 'less_equal',
+                      '>': 'greater', '>=': 'greater_equal'}
+
+
+# The heavy whole-frame operations of the app behind one interface: parsing,
+# the column profile (describe), correlations, crosstab counts, pivot partials,
+# category counts, duplicate rows and the dataset viewer's sorts, filters and
+# pages. An engine works on its own native frame and returns the in-tree
+# result objects (ColumnProfile, CorrelationEngine, Contingency, GroupPartials,
+# DuplicateIndex), whose views are pandas; the native frame is converted to
+# pandas only for the sections that draw rows.
+class PandasEngine:
+    name = 'pandas'
+    # The native frame is the pandas frame itself
+    pandas_native = True
+    # Native frames can be backed by the shared memory-mapped dataset store
+    memory_mappable = False
+
+    def read_csv(self, source, compression=None):
+        return ingest.read_csv(source, compression=compression)
+
+    def read_columnar(self, source, columns=None, filters=()):
+        return source.read(columns, filters)
+
+    def to_pandas(self, frame):
+        return frame
+
+    # Empty frame with the columns and dtypes the pandas view will have
+    def schema(self, frame):
+        return frame.iloc[:0]
+
+    def rows(self, frame):
+        return len(frame)
+
+    def profile(self, frame):
+        return profiling.profile_frame(frame)
+
+    def correlation(self, frame, method='pearson'):
+        return correlation.CorrelationEngine(frame, method)
+
+    def contingency(self, frame, row, col, top_n=aggregation.TOP_CATEGORIES):
+        return aggregation.Contingency(frame, row, col, top_n=top_n)
+
+    def group_partials(self, frame, index, value):
+        return aggregation.GroupPartials(frame, index, value)
+
+    def group_counts(self, frame, columns):
+        return aggregation.group_counts(frame, columns)
+
+    def duplicates(self, frame):
+        return dedupe.DuplicateIndex(frame)
+
+    # Row positions ordered by one column, missing values last and ties in file order
+    def sort_order(self, frame, column, ascending=True):
+        values = frame[column].reset_index(drop=True)
+        return values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+
+    # Which rows hold a value comparing true to value; missing values never match
+    def filter_mask(self, frame, column, op, value):
+        values = frame[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(values.cat.categories.dtype)
+        present = values.notna().to_numpy()
+        mask = np.zeros(len(values), dtype=bool)
+        mask[present] = paging.COMPARISONS[op](values[present], value).to_numpy()
+        return mask
+
+    # The rows at positions, indexed by their row positions
+    def take(self, frame, positions):
+        page = frame.iloc[positions]
+        page.index = positions
+        return page
+
+
+def _is_numeric_type(arrow_type):
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type)
+
+
+def _as_float(column):
+    return pc.cast(column, pa.float64()).to_numpy(zero_copy_only=False)
+
+
+# Categorical columns: the number of distinct values and the top_n most
+# frequent ones, picked in Arrow so only they reach Python
+def _value_counts(column, top_n):
+    counts = pc.value_counts(column.drop_null())
+    if not len(counts):
+        return 0, pd.Series(dtype='int64')
+    counts = pa.table({'values': counts.field('values'), 'counts': counts.field('counts')})
+    top = counts.take(pc.sort_indices(counts, sort_keys=[('counts', 'descending')])[:top_n])
+    return len(counts), pd.Series(top.column('counts').to_numpy(), index=top.column('values').to_pylist())
+
+
+# One column's profile row and top values. A numeric column is sorted once by
+# Arrow (missing values and NaNs dropped) and every order statistic is read
+# from the sorted values, as in the pandas profile; mean and variance come from
+# Arrow's aggregate kernels.
+def _profile_column(column, top_n):
+    if not _is_numeric_type(column.type):
+        distinct, top = _value_counts(column, top_n)
+        count = len(column) - column.null_count
+        return {'kind': 'categorical', 'count': count, 'nulls': column.null_count, 'distinct': distinct}, top
+    values = pc.cast(column, pa.float64()).drop_null()
+    values = values.filter(pc.invert(pc.is_nan(values)))
+    count = len(values)
+    ordered = values.take(pc.sort_indices(values)).to_numpy()
+    counts = np.array([count])
+    row = {
+        'kind': 'numeric',
+        'count': count,
+        'nulls': len(column) - count,
+        'mean': pc.mean(values).as_py() if count else np.nan,
+        'var': pc.variance(values, ddof=1).as_py() if count > 1 else np.nan,
+        'distinct': int((ordered[1:] != ordered[:-1]).sum()) + (count > 0),
+    }
+    row['std'] = np.sqrt(row['var'])
+    for q, name in [(0.0, 'min'), (1.0, 'max')] + [(q, f'{q:.0%}') for q in profiling.QUANTILES]:
+        row[name] = profiling.sorted_quantiles(ordered[:, None], counts, q)[0] if count else np.nan
+    return row, profiling.top_values_sorted(ordered, top_n)
+
+
+# The same operations on a pyarrow Table. Arrow's CSV reader and group-by are
+# multi-threaded, the per-column kernels of the profile and the correlation
+# ranks run on a thread pool (Arrow releases the GIL), and the correlation
+# matrix itself is one multi-threaded BLAS product as in the pandas engine.
+class ArrowEngine:
+    name = 'arrow'
+    pandas_native = False
+    memory_mappable = True
+
+    def __init__(self, threads=ENGINE_THREADS):
+        self.threads = threads
+
+    # Empty fields are missing, dates and timestamps are read back as text and
+    # empty columns as floats, so the pandas view matches pd.read_csv
+    def read_csv(self, source, compression=None):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        raw = pa.py_buffer(source.getbuffer()) if hasattr(source, 'getbuffer') else source
+        table = pa_csv.read_csv(pa.input_stream(raw, compression=compression),
+                                read_options=pa_csv.ReadOptions(use_threads=True),
+                                convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+        for i, field in enumerate(table.schema):
+            if pa.types.is_temporal(field.type):
+                table = table.set_column(i, field.name, pc.cast(table.column(i), pa.string()))
+            elif pa.types.is_null(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+        return table
+
+    def read_columnar(self, source, columns=None, filters=()):
+        return source.read_table(columns, filters)
+
+    def to_pandas(self, table):
+        return table.to_pandas()
+
+    def schema(self, table):
+        return table.schema.empty_table().to_pandas()
+
+    def rows(self, table):
+        return table.num_rows
+
+    def _map(self, function, items):
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            return list(pool.map(function, items))
+
+    def profile(self, table, top_n=profiling.TOP_VALUES):
+        results = self._map(lambda column: _profile_column(column, top_n), table.columns)
+        stats = pd.DataFrame([row for row, _ in results], index=table.column_names)
+        top_values = {name: top for name, (_, top) in zip(table.column_names, results)}
+        return profiling.ColumnProfile(stats, top_values, table.num_rows)
+
+    def correlation(self, table, method='pearson'):
+        method = method.lower()
+        if method not in ('pearson', 'spearman'):
+            raise ValueError(f"Unsupported correlation method: {method}")
+        columns = [field.name for field in table.schema if _is_numeric_type(field.type)]
+
+        def prepare(name):
+            column = table.column(name)
+            if method == 'pearson':
+                return _as_float(column)
+            # Average ranks of tied values, with missing values left out
+            low = _as_float(pc.rank(column, tiebreaker='min'))
+            high = _as_float(pc.rank(column, tiebreaker='max'))
+            ranks = (low + high) / 2
+            ranks[pc.is_null(column).to_numpy(zero_copy_only=False)] = np.nan
+            return ranks
+
+        prepared = self._map(prepare, columns)
+        matrix = np.column_stack(prepared) if prepared else np.empty((table.num_rows, 0))
+        return correlation.CorrelationEngine.from_matrix(columns, matrix, method)
+
+    def contingency(self, table, row, col, top_n=aggregation.TOP_CATEGORIES):
+        pairs = table.select([row, col]).drop_null().group_by([row, col], use_threads=True).aggregate(
+            [([], 'count_all')])
+        pairs = pairs.to_pandas().rename(columns={'count_all': 'count'})
+        return aggregation.Contingency.from_pair_counts(row, col, pairs, top_n=top_n)
+
+    def group_partials(self, table, index, value):
+        values = table.column(value)
+        frame = pa.table({'key': table.column(index), 'value': values}).filter(pc.is_valid(table.column(index)))
+        numeric = _is_numeric_type(values.type)
+        shift = 0.0
+        if numeric:
+            values = pc.cast(values, pa.float64())
+            mean = pc.mean(values).as_py()
+            shift = mean if mean is not None else 0.0
+            shifted = pc.subtract(pc.cast(frame.column('value'), pa.float64()), shift)
+            frame = pa.table({'key': frame.column('key'), 'value': shifted,
+                              'square': pc.multiply(shifted, shifted)})
+            partials = frame.group_by('key', use_threads=True).aggregate(
+                [('value', 'count'), ('value', 'sum'), ('square', 'sum')])
+        else:
+            partials = frame.group_by('key', use_threads=True).aggregate([('value', 'count')])
+        partials = partials.to_pandas().set_index('key').rename(
+            columns={'value_count': 'count', 'value_sum': 'sum', 'square_sum': 'sumsq'})
+        return aggregation.GroupPartials.from_partials(index, value, numeric, shift, partials)
+
+    def group_counts(self, table, columns):
+        columns = list(columns)
+        counts = table.select(columns).drop_null().group_by(columns, use_threads=True).aggregate([([], 'count_all')])
+        return counts.to_pandas().rename(columns={'count_all': 'count'})
+
+    def duplicates(self, table):
+        keyed = table.append_column(_ROW_COLUMN, pa.array(np.arange(table.num_rows, dtype=np.int64)))
+        groups = keyed.group_by(table.column_names, use_threads=True).aggregate(
+            [(_ROW_COLUMN, 'min'), ([], 'count_all')])
+        return dedupe.DuplicateIndex.from_groups(groups.column(f'{_ROW_COLUMN}_min').to_numpy(),
+                                                 groups.column('count_all').to_numpy(), table.num_rows)
+
+    def sort_order(self, table, column, ascending=True):
+        order = pc.array_sort_indices(table.column(column), order='ascending' if ascending else 'descending',
+                                      null_placement='at_end')
+        return order.to_numpy().astype(np.int64, copy=False)
+
+    def filter_mask(self, table, column, op, value):
+        values = table.column(column)
+        mask = pc.fill_null(pc.call_function(_ARROW_COMPARISONS[op], [values, value]), False)
+        if pa.types.is_floating(values.type):
+            mask = pc.and_(mask, pc.invert(pc.fill_null(pc.is_nan(values), False)))
+        return mask.to_numpy(zero_copy_only=False)
+
+    def take(self, table, positions):
+        page = table.take(positions).to_pandas()
+        page.index = positions
+        return page
+
+
+ENGINES = {'pandas': PandasEngine}
+if HAS_ARROW_ENGINE:
+    ENGINES['arrow'] = ArrowEngine
+
+
+# Engine names, the multi-threaded one first when it is installed
+def available_engines():
+    return sorted(ENGINES, key=lambda name: name == 'pandas')
+
+
+def get_engine(name):
+    return ENGINES[name]()
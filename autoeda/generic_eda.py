@@ -1,339 +1,1076 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import io
-import missingno as msno
-import matplotlib.pyplot as plt
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from scipy.stats import pearsonr, spearmanr
-from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler, Normalizer
-from sklearn.feature_selection import SelectKBest, f_regression
-from wordcloud import WordCloud
-from sklearn.cluster import KMeans
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-def main():
-    st.title('Advanced EDA on Uploaded Dataset')
-    st.subheader('Exploratory Data Analysis using Streamlit and Plotly')
+import ingest
+import plotting
+import missingness
+import clustering
+import tokens
+import aggregation
+import dedupe
+import engines
+import selection
+import scaling
+import outliers
+import paging
+import sketches
+import store
 
-    # File uploader allows user to add their own CSV
-    uploaded_file = st.sidebar.file_uploader("Upload your input CSV file", type=["csv"])
+# Dtype groups used to pick columns for each section; compacted frames hold
+# narrower numbers, categoricals and Arrow strings besides float64/int64/object.
+NUMERIC_DTYPES = ['number']
+CATEGORICAL_DTYPES = ['object', 'category', 'string']
+# Threads computing sections at the same time
+SECTION_WORKERS = min(8, os.cpu_count() or 1)
 
-    if uploaded_file is not None:
-        data = pd.read_csv(uploaded_file)
+# One parse cache per server process, shared by every session and rerun
+@st.cache_resource
+def get_parse_cache():
+    return ingest.ParseCache(ingest.PARSE_CACHE_BUDGET_MB * 1024 * 1024)
 
-        with st.sidebar:
-            show_data = st.checkbox('Show Dataset', False)
-            show_info = st.checkbox('Show Data Info', False)
-            show_summary_numeric = st.checkbox('Show Summary Statistics (Numeric)', False)
-            show_summary_categorical = st.checkbox('Show Summary Statistics (Categorical)', False)
-            show_missing = st.checkbox('Show Missing Values', False)
-            show_distribution = st.checkbox('Show Distribution Plot', False)
-            show_boxplot = st.checkbox('Show Box Plot', False)
-            show_violinplot = st.checkbox('Show Violin Plot', False)
-            show_heatmap = st.checkbox('Correlation Heatmap', False)
-            show_scatterplot = st.checkbox('Show Scatter Plot', False)
-            show_crosstab = st.checkbox('Show Crosstab Analysis', False)
-            show_unique_values = st.checkbox('Show Unique Values Count', False)
-            show_pairplot = st.checkbox('Show Pair Plot', False)
-            show_correlation = st.checkbox('Show Correlation Analysis', False)
-            show_feature_scaling = st.checkbox('Show Feature Scaling', False)
-            show_feature_selection = st.checkbox('Show Feature Selection', False)
-            show_duplicates = st.checkbox('Show Duplicate Rows', False)
-            show_outliers = st.checkbox('Show Outlier Detection', False)
-            show_pivot_table = st.checkbox('Show Pivot Table', False)
-            show_wordcloud = st.checkbox('Show Word Cloud', False)
-            show_parallel_coordinates = st.checkbox('Show Parallel Coordinates Plot', False)
-            show_bubble = st.checkbox('Show Bubble Plot', False)
-            show_piechart = st.checkbox('Show Pie Chart', False)
-            show_treemap = st.checkbox('Show Treemap', False)
-            show_3d_scatter = st.checkbox('Show 3D Scatter Plot', False)
-            show_3d_kmeans = st.checkbox('Show 3D K-Means Clustering', False)
-
-        if show_data:
-            st.write(data)
-
-        if show_info:
-            buffer = io.StringIO()
-            data.info(buf=buffer)
-            s = buffer.getvalue()
-            st.text(s)
-
-        if show_summary_numeric:
-            st.subheader("Summary Statistics (Numeric)")
-            st.write(data.describe())
-
-        if show_summary_categorical:
-            st.subheader("Summary Statistics (Categorical)")
-            categorical_columns = data.select_dtypes(include=['object']).columns
-            if len(categorical_columns) > 0:
-                st.write(data[categorical_columns].describe())
-            else:
-                st.write("No categorical columns found in the dataset.")
-
-        if show_missing:
-            st.subheader("Missing Values Matrix")
-            fig, ax = plt.subplots()
-            msno.matrix(data, ax=ax)  # Missingno matrix plot
-            st.pyplot(fig)
-
-        if show_distribution:
-            columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            column_to_plot = st.selectbox("Select Column for Histogram", columns, key='hist')
-            fig = px.histogram(data, x=column_to_plot, nbins=20)
-            st.plotly_chart(fig, use_container_width=True)
+# One dataset store per server process; the files it maps are shared with
+# every other server process using the same store directory
+@st.cache_resource
+def get_dataset_store():
+    return store.DatasetStore()
 
-        if show_boxplot:
-            columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            column_to_plot = st.selectbox("Select Column for Box Plot", columns, key='box')
-            fig = px.box(data, y=column_to_plot)
-            st.plotly_chart(fig, use_container_width=True)
+# The browser session a script run belongs to, which holds the store references
+def session_id():
+    script_ctx = get_script_run_ctx()
+    return script_ctx.session_id if script_ctx is not None else 'script'
 
-        if show_violinplot:
-            columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            column_to_plot = st.selectbox("Select Column for Violin Plot", columns, key='violin')
-            fig = px.violin(data, y=column_to_plot)
-            st.plotly_chart(fig, use_container_width=True)
+# Hashing a large upload takes a while, so remember the hash per uploaded file
+def upload_digest(uploaded_file):
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id is None:
+        return ingest.content_hash(uploaded_file)
+    digests = st.session_state.setdefault('upload_digests', {})
+    if file_id not in digests:
+        digests[file_id] = ingest.content_hash(uploaded_file)
+    return digests[file_id]
 
-        if show_heatmap:
-            corr = data.corr()
-            fig = px.imshow(corr, text_auto=".2f")
-            fig.update_layout(height=600)  # Adjust the height as needed
-            st.plotly_chart(fig, use_container_width=True)
+# Standardized correlation matrix for the upload, built once per method
+def get_correlation_engine(ctx, method):
+    return ctx.cached('correlation', lambda: ctx.engine.correlation(ctx.native, method), method=method)
+
+# Point plots over large uploads offer a reduced rendering instead of every row
+def large_plot_mode(ctx, key):
+    if ctx.rows <= plotting.LARGE_PLOT_ROWS:
+        return None
+    return st.radio("Large Data Rendering", ("Density Grid", "Stratified Sample"), key=key, horizontal=True)
+
+# What every section reads: the upload parsed by the selected engine (or the
+# streaming summary), the shared parse cache and the sidebar options. The
+# whole-frame operations run on the engine's native frame; data is its pandas
+# view for the sections that draw rows, converted on first use. A columnar
+# upload is read only after every section has laid out its widgets: until
+# then native is None, the widgets are built from the schema (an empty frame
+# with the file's columns and dtypes), and each section requires the columns
+# it will read.
+class SectionContext:
+    def __init__(self, engine, summary, parse_cache, digest, compact, approximate, schema=None, rows=None):
+        self.engine = engine
+        self.native = None
+        self._data = None
+        # The kind and options (column projection) of the last load
+        self._loaded = None
+        self.summary = summary
+        self.parse_cache = parse_cache
+        self.digest = digest
+        self.compact = compact
+        self.approximate = approximate
+        self.schema = schema
+        self.rows = rows if rows is not None else getattr(summary, 'rows', 0)
+        self.required = set()
+
+    @property
+    def data(self):
+        if self._data is None and self.native is not None:
+            if self.engine.pandas_native:
+                return self.native
+            # Keyed like the load, so a rerun that reads other columns gets their view
+            kind, options = self._loaded
+            self._data = self.cached(f'pandas_{kind}', lambda: self.engine.to_pandas(self.native), **options)
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+
+    # Parse the upload with the engine and cache it, compacted when asked (the
+    # sidebar offers compaction only for the pandas engine, whose native frame
+    # is the pandas view). A frame mapped from the dataset store is not cached
+    # (cache=False): its pages are shared already and are not heap memory.
+    # Returns the compaction report, if any.
+    def load(self, kind, read, cache=True, **options):
+        report = None
+        self._loaded = (kind, options)
+        if self.compact:
+            self.native, report = self.cached(f'compact_{kind}', lambda: ingest.compact_dtypes(read()), **options)
+        else:
+            self.native = self.cached(kind, read, **options) if cache else read()
+        if self.schema is None:
+            self.schema = self.engine.schema(self.native)
+        self.rows = self.engine.rows(self.native)
+        return report
+
+    # Results over the whole frame (profile, null bitmap, correlation matrix,
+    # duplicates, outlier scan) are cached per upload, not per projection, so a
+    # section computing one must require every column the result covers.
+    def require(self, columns):
+        self.required.update(col for col in columns if col is not None)
+
+    def require_all(self):
+        # Streaming mode answers from the summary and has no schema to require
+        if self.schema is not None:
+            self.require(self.schema.columns)
+
+    def key(self, kind, **options):
+        return ingest.parse_key(self.digest, kind, compact=self.compact, engine=self.engine.name, **options)
+
+    def cached(self, kind, parse, **options):
+        return self.parse_cache.get_or_parse(self.key(kind, **options), parse)
 
-        if show_scatterplot:
-            numeric_columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            x_axis = st.selectbox("Select X Axis", numeric_columns, index=0, key='scatter_x')
-            y_axis = st.selectbox("Select Y Axis", numeric_columns, index=1, key='scatter_y')
-            color_by = st.selectbox("Color By (Optional)", ["None"] + numeric_columns, index=0, key='scatter_color')
-            
-            if color_by == "None":
-                fig = px.scatter(data, x=x_axis, y=y_axis)
+    # The summary sections read from one cached column profile: the streaming
+    # accumulators when streaming, otherwise a single fused pass over the frame.
+    def stats(self):
+        if self.summary is not None:
+            return self.summary
+        return self.cached('profile', lambda: self.engine.profile(self.native))
+
+    def numeric_columns(self):
+        return self.schema.select_dtypes(include=NUMERIC_DTYPES).columns.tolist()
+
+    def categorical_columns(self):
+        return self.schema.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+
+# Sections lay out their widgets in page order on the script thread and queue
+# their computation; once the data is loaded the queue goes to a thread pool
+# (computations read ctx.data when they run, not when queued). Each result is
+# drawn into the section's own placeholder as soon as it is ready, so a slow
+# section no longer holds back the ones below it. Intermediates shared between
+# sections (profile, correlation engine, bin indexes) are parsed once through
+# the parse cache, which makes concurrent requests for the same key wait for
+# the first.
+class SectionScheduler:
+    def __init__(self, max_workers=SECTION_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._queued = []
+        self._tasks = {}
+
+    # compute runs on a worker thread and must not call Streamlit; render gets
+    # its result on the script thread
+    def submit(self, compute, render):
+        placeholder = st.empty()
+        placeholder.caption("Computing...")
+        self._queued.append((compute, placeholder, render))
+
+    def render_as_completed(self):
+        for compute, placeholder, render in self._queued:
+            self._tasks[self._pool.submit(compute)] = (placeholder, render)
+        self._queued = []
+        try:
+            for future in as_completed(self._tasks):
+                placeholder, render = self._tasks[future]
+                with placeholder.container():
+                    try:
+                        render(future.result())
+                    except Exception as exc:
+                        st.exception(exc)
+        finally:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+# Only the visible page of rows is sent to the browser. Sorting and filtering
+# run on the server: each sort column and filter is computed once per upload
+# into a row permutation or mask, and a page is a slice of the row positions.
+def show_dataset(ctx, scheduler):
+    ctx.require_all()
+    columns = ctx.schema.columns.tolist()
+    sort_col, order_col, size_col = st.columns(3)
+    sort_by = sort_col.selectbox("Sort By", ["None"] + columns, key='dataset_sort')
+    ascending = order_col.radio("Order", ("Ascending", "Descending"), key='dataset_order') == "Ascending"
+    page_size = size_col.selectbox("Rows per Page", paging.PAGE_SIZES, key='dataset_page_size',
+                                   index=paging.PAGE_SIZES.index(paging.DEFAULT_PAGE_SIZE))
+    filter_col, condition_col, value_col = st.columns(3)
+    filter_by = filter_col.selectbox("Filter Column", ["None"] + columns, key='dataset_filter')
+    condition = None
+    if filter_by != "None":
+        operator = condition_col.selectbox("Condition", ingest.FILTER_OPERATORS, key='dataset_condition')
+        filter_text = value_col.text_input("Value", key='dataset_value')
+        if filter_text:
+            try:
+                condition = (filter_by, operator, ingest.coerce_filter_value(ctx.schema[filter_by].dtype, filter_text))
+            except ValueError:
+                st.warning(f"'{filter_text}' is not a valid value for {filter_by}.")
+    page = st.number_input("Page", min_value=1, value=1, step=1, key='dataset_page')
+
+    def compute():
+        order = keep = None
+        if sort_by != "None":
+            order = ctx.cached('sort_order', lambda: ctx.engine.sort_order(ctx.native, sort_by, ascending),
+                               column=sort_by, ascending=ascending)
+        if condition is not None:
+            keep = ctx.cached('filter_mask', lambda: ctx.engine.filter_mask(ctx.native, *condition),
+                              condition=condition)
+        if order is not None and keep is not None:
+            view = ctx.cached('row_view', lambda: paging.RowView(ctx.rows, order, keep),
+                              column=sort_by, ascending=ascending, condition=condition)
+        else:
+            view = paging.RowView(ctx.rows, order, keep)
+        shown, positions = view.page(int(page), page_size)
+        return view, shown, ctx.engine.take(ctx.native, positions)
+
+    def render(result):
+        view, shown, rows = result
+        if not view.rows:
+            st.write("No rows match the filter.")
+            return
+        st.dataframe(rows)
+        first = (shown - 1) * page_size + 1
+        st.caption(f"Rows {first:,}-{first + len(rows) - 1:,} of {view.rows:,} "
+                   f"(page {shown:,} of {view.page_count(page_size):,}).")
+
+    scheduler.submit(compute, render)
+
+def show_info(ctx, scheduler):
+    ctx.require_all()
+
+    def compute():
+        buffer = io.StringIO()
+        ctx.data.info(buf=buffer)
+        return buffer.getvalue()
+
+    scheduler.submit(compute, st.text)
+
+def show_summary_numeric(ctx, scheduler):
+    st.subheader("Summary Statistics (Numeric)")
+    ctx.require_all()
+
+    def render(numeric_summary):
+        st.write(numeric_summary)
+        if ctx.summary is not None:
+            if ctx.summary.passes == 1:
+                caption = f"Computed in a single streaming pass over {ctx.summary.rows:,} rows."
             else:
-                fig = px.scatter(data, x=x_axis, y=y_axis, color=color_by)
-            
+                caption = (f"Computed in {ctx.summary.passes} streaming passes over {ctx.summary.rows:,} rows, "
+                           "restarting when a column turned out to hold text.")
+            rank_error = ctx.summary.quantile_rank_error()
+            if rank_error > 0:
+                caption += f" Quartiles are approximate (rank error within ±{rank_error:.2%})."
+            st.caption(caption)
+
+    scheduler.submit(lambda: ctx.stats().numeric_summary(), render)
+
+def show_summary_categorical(ctx, scheduler):
+    st.subheader("Summary Statistics (Categorical)")
+    ctx.require_all()
+
+    def render(categorical_summary):
+        if not categorical_summary.empty:
+            st.write(categorical_summary)
+            freq_error = ctx.summary.top_frequency_error() if ctx.summary is not None else 0
+            if freq_error > 0:
+                st.caption(f"Columns with too many distinct values are summarized approximately: 'freq' "
+                           f"may be up to {freq_error:,} below the true count.")
+        else:
+            st.write("No categorical columns found in the dataset.")
+
+    scheduler.submit(lambda: ctx.stats().categorical_summary(), render)
+
+def show_missing(ctx, scheduler):
+    st.subheader("Missing Values Count")
+    ctx.require_all()
+
+    def compute():
+        missing = ctx.stats().missing_counts()
+        # The map needs the row-level null mask, so streaming mode shows only the counts
+        if ctx.summary is not None:
+            return missing, None, None, None
+        bitmap = ctx.cached('null_bitmap', lambda: missingness.NullBitmap(ctx.data))
+        binned = ctx.cached('null_bins', lambda: bitmap.binned())
+        nullity_corr = ctx.cached('nullity_corr', lambda: bitmap.nullity_correlation())
+        return missing, bitmap, binned, nullity_corr
+
+    def render(result):
+        missing, bitmap, binned, nullity_corr = result
+        fig = px.bar(x=missing.index, y=missing.values, labels={'x': 'Column', 'y': 'Missing Values'})
+        st.plotly_chart(fig, use_container_width=True)
+        if bitmap is None:
+            return
+        st.subheader("Missing Values Map")
+        fig = px.imshow(binned, zmin=0, zmax=1, aspect="auto", color_continuous_scale='Greys',
+                        labels={'x': 'Column', 'y': 'Rows', 'color': 'Share Missing'})
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"{bitmap.rows:,} rows grouped into {len(binned)} row ranges.")
+
+        st.subheader("Nullity Correlation")
+        if len(nullity_corr.columns) > 1:
+            fig = px.imshow(nullity_corr, text_auto=".2f", zmin=-1, zmax=1, color_continuous_scale='RdBu')
             st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.write("Fewer than two columns have missing values.")
 
-        if show_unique_values:
-            st.subheader("Unique Values Count")
-            unique_counts = {col: data[col].nunique() for col in data.columns}
-            unique_df = pd.DataFrame.from_dict(unique_counts, orient='index', columns=['Count'])
-            st.write(unique_df)
-
-        if show_pairplot:
-            st.subheader("Pair Plot")
-            columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            selected_columns = st.multiselect("Select Columns for Pair Plot", columns)
-            if len(selected_columns) > 1:
-                fig = px.scatter_matrix(data[selected_columns])
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.warning("Please select at least two columns for the pair plot.")
-
-        if show_correlation:
-            st.subheader("Correlation Analysis")
-            numeric_columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            var = st.selectbox("Select Variable", numeric_columns, index=0, key='corr_var')
-            corr_method = st.radio("Correlation Method", ("Pearson", "Spearman"))
-            
-            if corr_method == "Pearson":
-                corr_matrix = data.corr(method='pearson')
-            else:
-                corr_matrix = data.corr(method='spearman')
-            
-            corr_with_var = corr_matrix[var].sort_values(ascending=False)
-            st.write(corr_with_var)
-        
-        if show_crosstab:
-            st.subheader("Crosstab Analysis")
-            categorical_columns = data.select_dtypes(include=['object']).columns.tolist()
-            if len(categorical_columns) >= 2:
-                var1 = st.selectbox("Select Variable 1", categorical_columns, index=0, key='crosstab_var1')
-                var2 = st.selectbox("Select Variable 2", categorical_columns, index=1, key='crosstab_var2')
-                
-                crosstab_count = pd.crosstab(data[var1], data[var2], margins=True)
-                crosstab_pct = pd.crosstab(data[var1], data[var2], margins=True, normalize='all')
-                
-                crosstab_result = crosstab_count.astype(str) + " (" + crosstab_pct.applymap(lambda x: f"{x:.2%}") + ")"
-                
-                st.write("Crosstab Result (Count and Percentage):")
-                st.write(crosstab_result)
-                
-                fig = px.imshow(crosstab_count, text_auto=True, aspect="auto")
-                fig.update_layout(
-                    xaxis_title=var2,
-                    yaxis_title=var1
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.warning("Please ensure the dataset has at least two categorical columns for Crosstab analysis.")
-
-
-        if show_feature_scaling:
-            st.subheader("Feature Scaling")
-            numeric_columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            selected_columns = st.multiselect("Select Columns for Scaling", numeric_columns)
-            
-            scaling_options = {
-                "StandardScaler": StandardScaler(),
-                "MinMaxScaler": MinMaxScaler(),
-                "RobustScaler": RobustScaler(),
-                "Normalizer": Normalizer()
-            }
-            
-            selected_scaler = st.selectbox("Select Scaling Type", list(scaling_options.keys()))
-            
-            if len(selected_columns) > 0:
-                scaler = scaling_options[selected_scaler]
-                scaled_data = scaler.fit_transform(data[selected_columns])
-                scaled_df = pd.DataFrame(scaled_data, columns=[f"{col}_scaled" for col in selected_columns])
-                before_scaling_df = data[selected_columns]
-                comparison_df = pd.concat([before_scaling_df, scaled_df], axis=1)
-                st.write(comparison_df)
-            else:
-                st.warning("Please select at least one column for feature scaling.")
+    scheduler.submit(compute, render)
+
+def show_distribution(ctx, scheduler):
+    columns = ctx.numeric_columns()
+    column_to_plot = st.selectbox("Select Column for Histogram", columns, key='hist')
+    ctx.require([column_to_plot])
+    binning = st.radio("Binning", ("Fixed", "Freedman-Diaconis"), key='hist_binning', horizontal=True)
+    if binning == "Fixed":
+        bins = st.slider("Number of Bins", min_value=5, max_value=200, value=plotting.HISTOGRAM_BINS, key='hist_bins')
+    else:
+        bins = 'fd'
+
+    def compute():
+        hist = ctx.cached('histogram', lambda: plotting.histogram(ctx.data[column_to_plot], bins=bins),
+                          column=column_to_plot, bins=bins)
+        return plotting.histogram_figure(hist, column_to_plot)
+
+    scheduler.submit(compute, lambda fig: st.plotly_chart(fig, use_container_width=True))
+
+def show_boxplot(ctx, scheduler):
+    columns = ctx.numeric_columns()
+    column_to_plot = st.selectbox("Select Column for Box Plot", columns, key='box')
+    ctx.require([column_to_plot])
+    scheduler.submit(lambda: px.box(ctx.data, y=column_to_plot),
+                     lambda fig: st.plotly_chart(fig, use_container_width=True))
+
+def show_violinplot(ctx, scheduler):
+    columns = ctx.numeric_columns()
+    column_to_plot = st.selectbox("Select Column for Violin Plot", columns, key='violin')
+    ctx.require([column_to_plot])
+    scheduler.submit(lambda: px.violin(ctx.data, y=column_to_plot),
+                     lambda fig: st.plotly_chart(fig, use_container_width=True))
+
+def show_heatmap(ctx, scheduler):
+    ctx.require(ctx.numeric_columns())
+
+    def compute():
+        corr = get_correlation_engine(ctx, 'pearson').matrix()
+        fig = px.imshow(corr, text_auto=".2f")
+        fig.update_layout(height=600)  # Adjust the height as needed
+        return fig
+
+    scheduler.submit(compute, lambda fig: st.plotly_chart(fig, use_container_width=True))
+
+def show_scatterplot(ctx, scheduler):
+    numeric_columns = ctx.numeric_columns()
+    x_axis = st.selectbox("Select X Axis", numeric_columns, index=0, key='scatter_x')
+    y_axis = st.selectbox("Select Y Axis", numeric_columns, index=1, key='scatter_y')
+    color_by = st.selectbox("Color By (Optional)", ["None"] + numeric_columns, index=0, key='scatter_color')
+    color = None if color_by == "None" else color_by
+    ctx.require([x_axis, y_axis, color])
+    mode = large_plot_mode(ctx, 'scatter_mode')
+
+    def compute():
+        data = ctx.data
+        caption = None
+        if mode == "Density Grid":
+            grid = ctx.cached('grid_2d', lambda: plotting.density_grid_2d(data, x_axis, y_axis, weight=color),
+                              x=x_axis, y=y_axis, weight=color, bins=plotting.GRID_BINS_2D)
+            fig = plotting.density_heatmap_figure(grid, x_axis, y_axis, color=color)
+            caption = plotting.reduction_caption(len(data), int((grid['counts'] > 0).sum()), 'grid cells')
+        elif mode == "Stratified Sample":
+            sample = plotting.stratified_sample(data, [x_axis, y_axis] + ([color] if color else []))
+            fig = px.scatter(sample, x=x_axis, y=y_axis, color=color)
+            caption = plotting.reduction_caption(len(data), len(sample))
+        elif color_by == "None":
+            fig = px.scatter(data, x=x_axis, y=y_axis)
+        else:
+            fig = px.scatter(data, x=x_axis, y=y_axis, color=color_by)
+        return fig, caption
 
-        if show_feature_selection:
-            st.subheader("Feature Selection")
-            numeric_columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            target_column = st.selectbox("Select Target Column", numeric_columns)
-            k = st.slider("Select Number of Top Features", min_value=1, max_value=len(numeric_columns), value=5)
+    def render(result):
+        fig, caption = result
+        if caption:
+            st.caption(caption)
+        st.plotly_chart(fig, use_container_width=True)
 
-            X = data.drop(columns=[target_column])
-            y = data[target_column]
+    scheduler.submit(compute, render)
 
-            selector = SelectKBest(score_func=f_regression, k=k)
-            selector.fit(X, y)
+def show_unique_values(ctx, scheduler):
+    st.subheader("Unique Values Count")
+    ctx.require_all()
 
-            feature_scores = pd.DataFrame({'Feature': X.columns, 'Score': selector.scores_})
-            feature_scores = feature_scores.sort_values(by='Score', ascending=False)
+    def compute():
+        if ctx.summary is None and ctx.approximate:
+            unique_df = ctx.cached('approx_unique', lambda: sketches.approximate_unique_counts(ctx.data))
+            return unique_df, not unique_df['Exact'].all()
+        return ctx.stats().unique_counts(), False
 
-            st.write("Feature Importance Scores:")
-            st.write(feature_scores)
+    def render(result):
+        unique_df, estimated = result
+        if estimated:
+            st.caption("Approximate counts from HyperLogLog sketches, with their standard error.")
+        st.write(unique_df)
 
-            fig = px.bar(feature_scores, x='Feature', y='Score', title='Feature Importance Scores')
+    scheduler.submit(compute, render)
+
+def show_pairplot(ctx, scheduler):
+    st.subheader("Pair Plot")
+    columns = ctx.numeric_columns()
+    selected_columns = st.multiselect("Select Columns for Pair Plot", columns)
+    ctx.require(selected_columns)
+    large = ctx.rows > plotting.LARGE_PLOT_ROWS
+    pair_mode = st.radio("Pair Plot Mode", ("Scatter Matrix", "Density Grid"), index=int(large),
+                         key='pair_mode', horizontal=True)
+    if len(selected_columns) > 1 and pair_mode == "Density Grid":
+        bins = plotting.PAIR_GRID_BINS
+
+        def compute():
+            data = ctx.data
+            indexes, edges, hists = {}, {}, {}
+            for col in selected_columns:
+                indexes[col], edges[col] = ctx.cached(
+                    'bin_index', lambda: plotting.bin_index(data[col], bins=bins), column=col, bins=bins)
+                hists[col] = ctx.cached(
+                    'histogram', lambda: plotting.histogram(data[col], bins=bins), column=col, bins=bins)
+            # One grid per unordered pair, cached in a fixed column order; the
+            # mirrored cell is its transpose
+            grids = {}
+            for i, x in enumerate(selected_columns):
+                for y in selected_columns[i + 1:]:
+                    a, b = sorted((x, y), key=str)
+                    grid = ctx.cached('pair_grid', lambda: plotting.pair_grid(indexes[a], indexes[b], bins),
+                                      pair=(a, b), bins=bins)
+                    grids[(a, b)], grids[(b, a)] = grid, grid.T
+            return plotting.pair_plot_figure(selected_columns, grids, edges, hists)
+
+        def render(fig):
             st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"{len(ctx.data):,} rows summarized on a {bins}x{bins} grid per column pair.")
 
-        if show_duplicates:
-            st.subheader("Duplicate Rows")
-            duplicates = data[data.duplicated()]
-            if duplicates.empty:
-                st.write("No duplicate rows found.")
-            else:
-                st.write(duplicates)
+        scheduler.submit(compute, render)
+    elif len(selected_columns) > 1:
+        scheduler.submit(lambda: px.scatter_matrix(ctx.data[selected_columns]),
+                         lambda fig: st.plotly_chart(fig, use_container_width=True))
+    else:
+        st.warning("Please select at least two columns for the pair plot.")
 
-        if show_outliers:
-            st.subheader("Outlier Detection")
-            numeric_columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            selected_column = st.selectbox("Select Column for Outlier Detection", numeric_columns)
+def show_correlation(ctx, scheduler):
+    st.subheader("Correlation Analysis")
+    numeric_columns = ctx.numeric_columns()
+    ctx.require(numeric_columns)
+    var = st.selectbox("Select Variable", numeric_columns, index=0, key='corr_var')
+    corr_method = st.radio("Correlation Method", ("Pearson", "Spearman"))
 
-            Q1 = data[selected_column].quantile(0.25)
-            Q3 = data[selected_column].quantile(0.75)
-            IQR = Q3 - Q1
+    def compute():
+        engine = get_correlation_engine(ctx, corr_method.lower())
+        return engine.with_column(var).sort_values(ascending=False)
 
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
+    scheduler.submit(compute, st.write)
 
-            outliers = data[(data[selected_column] < lower_bound) | (data[selected_column] > upper_bound)]
+def show_crosstab(ctx, scheduler):
+    st.subheader("Crosstab Analysis")
+    categorical_columns = ctx.categorical_columns()
+    if len(categorical_columns) >= 2:
+        var1 = st.selectbox("Select Variable 1", categorical_columns, index=0, key='crosstab_var1')
+        var2 = st.selectbox("Select Variable 2", categorical_columns, index=1, key='crosstab_var2')
+        ctx.require([var1, var2])
 
-            if outliers.empty:
-                st.write("No outliers found in the selected column.")
-            else:
-                st.write("Outliers:")
-                st.write(outliers)
-        
-        if show_pivot_table:
-            st.subheader("Pivot Table")
-            columns = data.columns.tolist()
-            index_column = st.selectbox("Select Index Column", columns)
-            value_column = st.selectbox("Select Value Column", columns)
-            agg_func = st.selectbox("Select Aggregation Function", ["mean", "sum", "count"])
+        top_n = st.slider("Maximum Categories per Axis", min_value=5, max_value=100,
+                          value=aggregation.TOP_CATEGORIES, key='crosstab_top_n')
+
+        def compute():
+            contingency = ctx.cached('crosstab', lambda: ctx.engine.contingency(ctx.native, var1, var2, top_n=top_n),
+                                     row=var1, col=var2, top_n=top_n)
+            return contingency, contingency.formatted()
 
-            pivot_table = pd.pivot_table(data, values=value_column, index=index_column, aggfunc=agg_func)
+        def render(result):
+            contingency, formatted = result
+            crosstab_count = contingency.table()
 
-            st.write(pivot_table)
+            st.write("Crosstab Result (Count and Percentage):")
+            st.write(formatted)
+            if contingency.collapsed:
+                st.caption(f"Categories beyond the {top_n} most frequent per axis are grouped into '{aggregation.OTHER_LABEL}'.")
 
-            fig = px.imshow(pivot_table, text_auto=True, aspect="auto")
+            fig = px.imshow(crosstab_count, text_auto=True, aspect="auto")
             fig.update_layout(
-                xaxis_title=value_column,
-                yaxis_title=index_column
+                xaxis_title=var2,
+                yaxis_title=var1
             )
             st.plotly_chart(fig, use_container_width=True)
-        
-        if show_wordcloud:
-            st.subheader("Word Cloud")
-            text_columns = data.select_dtypes(include=['object']).columns.tolist()
-            selected_column = st.selectbox("Select Text Column for Word Cloud", text_columns)
-            text = ' '.join(data[selected_column].astype(str))
-            wordcloud = WordCloud(background_color='white').generate(text)
-            plt.figure(figsize=(10, 8))
-            plt.imshow(wordcloud, interpolation='bilinear')
-            plt.axis('off')
-            st.pyplot(plt)
-
-        if show_parallel_coordinates:
-            st.subheader("Parallel Coordinates Plot")
-            numeric_columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            selected_columns = st.multiselect("Select Columns for Parallel Coordinates Plot", numeric_columns)
-            if len(selected_columns) > 1:
-                fig = px.parallel_coordinates(data, dimensions=selected_columns)
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.warning("Please select at least two columns for the parallel coordinates plot.")
-
-        if show_bubble:
-            st.subheader("Bubble Plot")
-            numeric_columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            x_column = st.selectbox("Select X-axis Column", numeric_columns)
-            y_column = st.selectbox("Select Y-axis Column", numeric_columns)
-            size_column = st.selectbox("Select Size Column", numeric_columns)
+
+        scheduler.submit(compute, render)
+    else:
+        st.warning("Please ensure the dataset has at least two categorical columns for Crosstab analysis.")
+
+def show_feature_scaling(ctx, scheduler):
+    st.subheader("Feature Scaling")
+    numeric_columns = ctx.numeric_columns()
+    selected_columns = st.multiselect("Select Columns for Scaling", numeric_columns)
+    ctx.require(selected_columns)
+
+    selected_scaler = st.selectbox("Select Scaling Type", scaling.SCALERS)
+
+    if len(selected_columns) > 0:
+        page = st.number_input("Preview Sample", min_value=0, value=0, step=1,
+                               help=f"Each sample shows a different random page of up to "
+                                    f"{scaling.PREVIEW_ROWS:,} rows.")
+
+        def compute():
+            data = ctx.data
+            scaling_stats = ctx.cached('scaling_stats', lambda: scaling.ScalingStats(data, selected_columns),
+                                       columns=tuple(selected_columns))
+            return scaling_stats, scaling.preview(data, scaling_stats, selected_scaler, page=page)
+
+        def render(result):
+            data = ctx.data
+            scaling_stats, comparison_df = result
+            if selected_scaler == 'RobustScaler' and scaling_stats.approximate:
+                st.caption("Median and interquartile range come from quantile sketches and are approximate.")
+            if len(comparison_df) < len(data):
+                st.caption(f"Showing {len(comparison_df):,} sampled rows of {len(data):,}.")
+            st.write(comparison_df)
+
+            if ingest.HAS_PYARROW and st.button("Export Scaled Data to Parquet"):
+                with tempfile.NamedTemporaryFile(suffix='.parquet') as export_file:
+                    scaling.export_parquet(data, scaling_stats, selected_scaler, export_file.name)
+                    st.download_button("Download Parquet", export_file.read(), file_name='scaled_data.parquet',
+                                       mime='application/octet-stream')
+
+        scheduler.submit(compute, render)
+    else:
+        st.warning("Please select at least one column for feature scaling.")
+
+def show_feature_selection(ctx, scheduler):
+    st.subheader("Feature Selection")
+    numeric_columns = ctx.numeric_columns()
+    target_column = st.selectbox("Select Target Column", numeric_columns)
+    scorer = st.selectbox("Select Scoring Function", list(selection.SCORERS))
+    ctx.require(numeric_columns)
+
+    features = len(numeric_columns) - 1
+    if features < 1:
+        st.warning("Feature selection needs at least one numeric column besides the target.")
+        return
+    k = 1
+    if features > 1:
+        k = st.slider("Select Number of Top Features", min_value=1, max_value=features, value=min(5, features))
+
+    def compute():
+        return ctx.cached('feature_scores', lambda: selection.feature_scores(ctx.data, target_column, scorer),
+                          target=target_column, scorer=scorer)
+
+    def render(feature_scores):
+        top_features = feature_scores.head(k)
+
+        st.write("Feature Importance Scores:")
+        st.write(top_features)
+
+        fig = px.bar(top_features, x='Feature', y='Score', title=f'Top {len(top_features)} Features by {scorer}')
+        st.plotly_chart(fig, use_container_width=True)
+
+    scheduler.submit(compute, render)
+
+def show_duplicates(ctx, scheduler):
+    st.subheader("Duplicate Rows")
+    ctx.require_all()
+
+    def render(duplicates):
+        if duplicates.duplicate_rows == 0:
+            st.write("No duplicate rows found.")
+        else:
+            st.write(f"{duplicates.duplicate_rows:,} duplicate rows in {len(duplicates.counts):,} groups. "
+                     "Each group is shown once with the number of rows it occurs in.")
+            st.write(duplicates.groups(ctx.data))
+
+    scheduler.submit(lambda: ctx.cached('duplicates', lambda: ctx.engine.duplicates(ctx.native)), render)
+
+    if st.checkbox("Find Near-Duplicate Rows (MinHash)", False, key='near_duplicates'):
+        text_columns = ctx.categorical_columns() or ctx.schema.columns.tolist()
+        near_columns = st.multiselect("Select Columns to Compare", ctx.schema.columns.tolist(), default=text_columns)
+        threshold = st.slider("Similarity Threshold", 0.5, 0.95, dedupe.NEAR_DUPLICATE_THRESHOLD, 0.05)
+        if near_columns:
+            def render_near(near):
+                if near.near_duplicate_rows == 0:
+                    st.write("No near-duplicate rows found.")
+                else:
+                    st.write(f"{near.near_duplicate_rows:,} rows in {len(near.counts):,} groups of rows "
+                             f"with similar words (Jaccard similarity of about {threshold:.2f} or more).")
+                    st.write(near.groups(ctx.data))
+
+            scheduler.submit(
+                lambda: ctx.cached('near_duplicates', lambda: dedupe.NearDuplicates(ctx.data, threshold, near_columns),
+                                   columns=tuple(near_columns), threshold=threshold),
+                render_near)
+
+def show_outliers(ctx, scheduler):
+    st.subheader("Outlier Detection")
+    # The outlier pages show whole rows
+    ctx.require_all()
+    numeric_columns = ctx.numeric_columns()
+    selected_column = st.selectbox("Select Column for Outlier Detection", ['All Columns'] + numeric_columns)
+    column = None if selected_column == 'All Columns' else selected_column
+
+    # Quartiles of every numeric column, from the sketches, the cached
+    # profile, or one pandas quantile call inside the cached scan
+    def compute():
+        data = ctx.data
+        quartiles = None
+        caption = None
+        if ctx.approximate:
+            estimates = [
+                ctx.cached('approx_quartiles', lambda col=col: sketches.approximate_quantiles(data[col], [0.25, 0.75]),
+                           column=col)
+                for col in numeric_columns
+            ]
+            quartiles = pd.DataFrame({'Q1': [q1.value for q1, _ in estimates],
+                                      'Q3': [q3.value for _, q3 in estimates]}, index=numeric_columns)
+            errors = [q1.error for q1, _ in estimates if not q1.exact]
+            if errors:
+                caption = f"Quartiles estimated with a KLL sketch (rank error within ±{max(errors):.2%})."
+        elif ctx.summary is None:
+            stats = ctx.stats()
+            quartiles = pd.DataFrame({'Q1': [stats.quantile(col, 0.25) for col in numeric_columns],
+                                      'Q3': [stats.quantile(col, 0.75) for col in numeric_columns]},
+                                     index=numeric_columns)
+        outlier_scan = ctx.cached(
+            'outlier_scan',
+            lambda: outliers.OutlierScan(
+                data, quartiles if quartiles is not None else outliers.exact_quartiles(data, numeric_columns)),
+            approximate=ctx.approximate)
+        return outlier_scan, caption
+
+    def render(result):
+        outlier_scan, caption = result
+        if caption:
+            st.caption(caption)
+        st.write("Outliers per Column:")
+        st.write(outlier_scan.table())
+
+        outlier_rows = outlier_scan.outlier_rows(column)
+        if len(outlier_rows) == 0:
+            st.write("No outliers found in the selected column.")
+        else:
+            pages = (len(outlier_rows) - 1) // outliers.OUTLIER_PAGE_ROWS + 1
+            page = st.number_input("Outlier Page", min_value=1, max_value=pages, value=1, step=1,
+                                   key='outlier_page') - 1
+            first = page * outliers.OUTLIER_PAGE_ROWS
+            st.write(f"Outliers {first + 1:,}-{min(first + outliers.OUTLIER_PAGE_ROWS, len(outlier_rows)):,} "
+                     f"of {len(outlier_rows):,}:")
+            st.write(outlier_scan.page(ctx.data, column, page))
+
+    scheduler.submit(compute, render)
+
+    if st.checkbox("Multivariate Outliers (Isolation Forest)", False, key='isolation_forest'):
+        isolation_columns = st.multiselect("Select Columns for Isolation Forest", numeric_columns,
+                                           default=numeric_columns)
+        if isolation_columns:
+            def render_isolation(isolation):
+                caption = (f"{isolation.outlier_count:,} of {len(isolation.rows):,} complete rows flagged, "
+                           "most anomalous first.")
+                if isolation.sampled:
+                    caption += f" The forest was trained on a sample of {outliers.ISOLATION_SAMPLE_ROWS:,} rows."
+                st.caption(caption)
+                if isolation.outlier_count:
+                    pages = (isolation.outlier_count - 1) // outliers.OUTLIER_PAGE_ROWS + 1
+                    page = st.number_input("Isolation Forest Page", min_value=1, max_value=pages, value=1,
+                                           step=1, key='isolation_page') - 1
+                    st.write(isolation.page(ctx.data, page))
+
+            scheduler.submit(
+                lambda: ctx.cached('isolation_scan', lambda: outliers.IsolationScan(ctx.data, isolation_columns),
+                                   columns=tuple(isolation_columns)),
+                render_isolation)
+
+def show_pivot_table(ctx, scheduler):
+    st.subheader("Pivot Table")
+    columns = ctx.schema.columns.tolist()
+    index_column = st.selectbox("Select Index Column", columns)
+    value_column = st.selectbox("Select Value Column", columns)
+    agg_func = st.selectbox("Select Aggregation Function", aggregation.pivot_aggregations(ctx.schema[value_column]))
+    ctx.require([index_column, value_column])
+
+    def compute():
+        partials = ctx.cached('pivot_partials', lambda: ctx.engine.group_partials(ctx.native, index_column, value_column),
+                              index=index_column, value=value_column)
+        pivot_table = partials.result(agg_func)
+        return pivot_table, partials.largest_groups(pivot_table)
+
+    def render(result):
+        pivot_table, shown = result
+        st.write(pivot_table)
+
+        if len(shown) < len(pivot_table):
+            st.caption(f"Heatmap shows the {len(shown)} largest of {len(pivot_table):,} groups.")
+        fig = px.imshow(shown, text_auto=True, aspect="auto")
+        fig.update_layout(
+            xaxis_title=value_column,
+            yaxis_title=index_column
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    scheduler.submit(compute, render)
+
+def show_wordcloud(ctx, scheduler):
+    st.subheader("Word Cloud")
+    text_columns = ctx.categorical_columns()
+    if not text_columns:
+        st.write("No text columns found in the dataset.")
+        return
+    selected_column = st.selectbox("Select Text Column for Word Cloud", text_columns)
+    ctx.require([selected_column])
+
+    def compute():
+        frequencies = ctx.cached('token_frequencies', lambda: tokens.token_frequencies(ctx.data[selected_column]),
+                                 column=selected_column)
+        return ctx.cached('wordcloud_image', lambda: tokens.render_wordcloud(frequencies), column=selected_column)
+
+    def render(image):
+        if image is None:
+            st.write("No words found in the selected column.")
+        else:
+            st.image(image, use_container_width=True)
+
+    scheduler.submit(compute, render)
+
+def show_parallel_coordinates(ctx, scheduler):
+    st.subheader("Parallel Coordinates Plot")
+    numeric_columns = ctx.numeric_columns()
+    selected_columns = st.multiselect("Select Columns for Parallel Coordinates Plot", numeric_columns)
+    ctx.require(selected_columns)
+    if len(selected_columns) > 1:
+        scheduler.submit(lambda: px.parallel_coordinates(ctx.data, dimensions=selected_columns),
+                         lambda fig: st.plotly_chart(fig, use_container_width=True))
+    else:
+        st.warning("Please select at least two columns for the parallel coordinates plot.")
+
+def show_bubble(ctx, scheduler):
+    st.subheader("Bubble Plot")
+    numeric_columns = ctx.numeric_columns()
+    x_column = st.selectbox("Select X-axis Column", numeric_columns)
+    y_column = st.selectbox("Select Y-axis Column", numeric_columns)
+    size_column = st.selectbox("Select Size Column", numeric_columns)
+    ctx.require([x_column, y_column, size_column])
+    mode = large_plot_mode(ctx, 'bubble_mode')
+
+    def compute():
+        data = ctx.data
+        caption = None
+        if mode == "Density Grid":
+            # One bubble per occupied cell, sized by the mean of the size column
+            grid = ctx.cached(
+                'grid_2d',
+                lambda: plotting.density_grid_2d(data, x_column, y_column, weight=size_column, bins=plotting.SAMPLE_BINS),
+                x=x_column, y=y_column, weight=size_column, bins=plotting.SAMPLE_BINS)
+            points = plotting.grid_points(grid, [x_column, y_column])
+            points = points[points['Mean'] > 0]
+            fig = px.scatter(points, x=x_column, y=y_column, size='Mean', color='Rows',
+                             labels={'Mean': f'Mean {size_column}'})
+            caption = plotting.reduction_caption(len(data), len(points), 'grid cells')
+        elif mode == "Stratified Sample":
+            sample = plotting.stratified_sample(data, [x_column, y_column, size_column])
+            fig = px.scatter(sample, x=x_column, y=y_column, size=size_column)
+            caption = plotting.reduction_caption(len(data), len(sample))
+        else:
             fig = px.scatter(data, x=x_column, y=y_column, size=size_column)
-            st.plotly_chart(fig, use_container_width=True)
+        return fig, caption
 
-        if show_piechart:
-            st.subheader("Pie Chart")
-            categorical_columns = data.select_dtypes(include=['object']).columns.tolist()
-            selected_column = st.selectbox("Select Column for Pie Chart", categorical_columns)
-            fig = px.pie(data, names=selected_column)
-            st.plotly_chart(fig, use_container_width=True)
+    def render(result):
+        fig, caption = result
+        if caption:
+            st.caption(caption)
+        st.plotly_chart(fig, use_container_width=True)
 
-        if show_treemap:
-            st.subheader("Treemap")
-            categorical_columns = data.select_dtypes(include=['object']).columns.tolist()
-            selected_column = st.selectbox("Select Column for Treemap", categorical_columns)
-            fig = px.treemap(data, path=[selected_column])
-            st.plotly_chart(fig, use_container_width=True)
-        if show_3d_scatter:
-            st.subheader("3D Scatter Plot")
-            numeric_columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            x_column = st.selectbox("Select X-axis Column", numeric_columns, key='3d_scatter_x')
-            y_column = st.selectbox("Select Y-axis Column", numeric_columns, key='3d_scatter_y')
-            z_column = st.selectbox("Select Z-axis Column", numeric_columns, key='3d_scatter_z')
-            color_column = st.selectbox("Select Color Column", ["None"] + numeric_columns, key='3d_scatter_color')
-            
-            if color_column == "None":
-                fig = px.scatter_3d(data, x=x_column, y=y_column, z=z_column)
+    scheduler.submit(compute, render)
+
+# Category counts for a pie chart or treemap, grouped once per column path by
+# the engine with the smaller categories folded into Other; the figure is
+# drawn from these rows rather than one row per record
+def get_category_counts(ctx, path):
+    return ctx.cached('category_counts',
+                      lambda: aggregation.collapse_counts(ctx.engine.group_counts(ctx.native, path), path),
+                      path=tuple(path))
+
+def render_category_figure(result):
+    fig, collapsed = result
+    st.plotly_chart(fig, use_container_width=True)
+    if collapsed:
+        st.caption(f"Categories beyond the {aggregation.TOP_CATEGORIES} most frequent "
+                   f"are grouped into '{aggregation.OTHER_LABEL}'.")
+
+def show_piechart(ctx, scheduler):
+    st.subheader("Pie Chart")
+    categorical_columns = ctx.categorical_columns()
+    if not categorical_columns:
+        st.write("No categorical columns found in the dataset.")
+        return
+    selected_column = st.selectbox("Select Column for Pie Chart", categorical_columns)
+    ctx.require([selected_column])
+
+    def compute():
+        counts, collapsed = get_category_counts(ctx, [selected_column])
+        return px.pie(counts, names=selected_column, values='count'), collapsed
+
+    scheduler.submit(compute, render_category_figure)
+
+def show_treemap(ctx, scheduler):
+    st.subheader("Treemap")
+    categorical_columns = ctx.categorical_columns()
+    if not categorical_columns:
+        st.write("No categorical columns found in the dataset.")
+        return
+    path = st.multiselect("Select Columns for Treemap (outermost first)", categorical_columns,
+                          default=categorical_columns[:1])
+    if not path:
+        st.write("Select at least one column.")
+        return
+    ctx.require(path)
+
+    def compute():
+        counts, collapsed = get_category_counts(ctx, path)
+        return px.treemap(counts, path=path, values='count'), collapsed
+
+    scheduler.submit(compute, render_category_figure)
+
+def show_3d_scatter(ctx, scheduler):
+    st.subheader("3D Scatter Plot")
+    numeric_columns = ctx.numeric_columns()
+    x_column = st.selectbox("Select X-axis Column", numeric_columns, key='3d_scatter_x')
+    y_column = st.selectbox("Select Y-axis Column", numeric_columns, key='3d_scatter_y')
+    z_column = st.selectbox("Select Z-axis Column", numeric_columns, key='3d_scatter_z')
+    color_column = st.selectbox("Select Color Column", ["None"] + numeric_columns, key='3d_scatter_color')
+    color = None if color_column == "None" else color_column
+    ctx.require([x_column, y_column, z_column, color])
+    mode = large_plot_mode(ctx, '3d_scatter_mode')
+
+    def compute():
+        data = ctx.data
+        caption = None
+        if mode == "Density Grid":
+            grid = ctx.cached(
+                'grid_3d', lambda: plotting.density_grid_3d(data, x_column, y_column, z_column, weight=color),
+                x=x_column, y=y_column, z=z_column, weight=color, bins=plotting.GRID_BINS_3D)
+            fig = plotting.density_scatter_3d_figure(grid, x_column, y_column, z_column, color=color)
+            caption = plotting.reduction_caption(len(data), int((grid['counts'] > 0).sum()), 'grid cells')
+        elif mode == "Stratified Sample":
+            sample = plotting.stratified_sample(data, [x_column, y_column, z_column] + ([color] if color else []))
+            fig = px.scatter_3d(sample, x=x_column, y=y_column, z=z_column, color=color)
+            caption = plotting.reduction_caption(len(data), len(sample))
+        elif color_column == "None":
+            fig = px.scatter_3d(data, x=x_column, y=y_column, z=z_column)
+        else:
+            fig = px.scatter_3d(data, x=x_column, y=y_column, z=z_column, color=color_column)
+        return fig, caption
+
+    def render(result):
+        fig, caption = result
+        if caption:
+            st.caption(caption)
+        st.plotly_chart(fig, use_container_width=True)
+
+    scheduler.submit(compute, render)
+
+def show_3d_kmeans(ctx, scheduler):
+    st.subheader("3D K-Means Clustering")
+    numeric_columns = ctx.numeric_columns()
+    x_column = st.selectbox("Select X-axis Column", numeric_columns, key='3d_kmeans_x')
+    y_column = st.selectbox("Select Y-axis Column", numeric_columns, key='3d_kmeans_y')
+    z_column = st.selectbox("Select Z-axis Column", numeric_columns, key='3d_kmeans_z')
+    n_clusters = st.number_input("Select Number of Clusters", min_value=2, max_value=10, value=3, step=1)
+
+    features = (x_column, y_column, z_column)
+    ctx.require(features)
+
+    def compute():
+        data = ctx.data
+        result = ctx.cached('kmeans', lambda: clustering.ClusterResult(data, features, int(n_clusters)),
+                            columns=features, k=int(n_clusters))
+        sample = result.sample(data)
+
+        fig = px.scatter_3d(sample, x=x_column, y=y_column, z=z_column, color='Cluster', opacity=0.6)
+        fig.add_trace(go.Scatter3d(x=result.centroids[x_column], y=result.centroids[y_column],
+                                   z=result.centroids[z_column], mode='markers', name='Centroids',
+                                   marker=dict(symbol='x', size=8, color='black'),
+                                   customdata=result.centroids[['Cluster', 'Size']],
+                                   hovertemplate='cluster %{customdata[0]}<br>%{customdata[1]:,} rows<extra></extra>'))
+        return result, sample, fig
+
+    def render(computed):
+        result, sample, fig = computed
+        st.plotly_chart(fig, use_container_width=True)
+        fitted_with = "mini-batch K-Means" if result.minibatch else "K-Means"
+        st.caption(f"Fitted with {fitted_with} on {len(result.labels):,} complete rows; "
+                   f"showing centroids and a sample of {len(sample):,} rows.")
+
+    scheduler.submit(compute, render)
+
+    if st.checkbox("Run Elbow / Silhouette Sweep", False, key='kmeans_sweep'):
+        k_min, k_max = st.slider("Range of k", min_value=2, max_value=15, value=(2, 10), key='kmeans_k_range')
+
+        def render_sweep(sweep):
+            col1, col2 = st.columns(2)
+            col1.plotly_chart(px.line(sweep, x='k', y='Inertia', markers=True, title='Elbow'), use_container_width=True)
+            col2.plotly_chart(px.line(sweep, x='k', y='Silhouette', markers=True, title='Silhouette'), use_container_width=True)
+
+        scheduler.submit(
+            lambda: ctx.cached('kmeans_sweep', lambda: clustering.sweep_k(ctx.data, features, range(k_min, k_max + 1)),
+                               columns=features, ks=(k_min, k_max)),
+            render_sweep)
+
+def show_compaction(compaction_report):
+    with st.expander("Memory Before and After Compaction"):
+        before = compaction_report['Memory Before (KB)'].sum() / 1024
+        after = compaction_report['Memory After (KB)'].sum() / 1024
+        st.write(f"Total: {before:,.1f} MB before, {after:,.1f} MB after")
+        st.write(compaction_report)
+
+def main():
+    st.title('Advanced EDA on Uploaded Dataset')
+    st.subheader('Exploratory Data Analysis using Streamlit and Plotly')
+
+    # File uploader allows user to add their own CSV (plain, gzip or zstd), Parquet or Feather file
+    uploaded_file = st.sidebar.file_uploader("Upload your input data file", type=ingest.UPLOAD_TYPES)
+
+    if uploaded_file is not None:
+        file_format, compression = ingest.upload_format(uploaded_file.name)
+        columnar = None
+        if file_format != 'csv':
+            columnar = ingest.ColumnarSource(uploaded_file, file_format)
+
+        with st.sidebar:
+            # Every section in page order, paired with its checkbox
+            sections = [
+                (st.checkbox('Show Dataset', False), show_dataset),
+                (st.checkbox('Show Data Info', False), show_info),
+                (st.checkbox('Show Summary Statistics (Numeric)', False), show_summary_numeric),
+                (st.checkbox('Show Summary Statistics (Categorical)', False), show_summary_categorical),
+                (st.checkbox('Show Missing Values', False), show_missing),
+                (st.checkbox('Show Distribution Plot', False), show_distribution),
+                (st.checkbox('Show Box Plot', False), show_boxplot),
+                (st.checkbox('Show Violin Plot', False), show_violinplot),
+                (st.checkbox('Correlation Heatmap', False), show_heatmap),
+                (st.checkbox('Show Scatter Plot', False), show_scatterplot),
+                (st.checkbox('Show Crosstab Analysis', False), show_crosstab),
+                (st.checkbox('Show Unique Values Count', False), show_unique_values),
+                (st.checkbox('Show Pair Plot', False), show_pairplot),
+                (st.checkbox('Show Correlation Analysis', False), show_correlation),
+                (st.checkbox('Show Feature Scaling', False), show_feature_scaling),
+                (st.checkbox('Show Feature Selection', False), show_feature_selection),
+                (st.checkbox('Show Duplicate Rows', False), show_duplicates),
+                (st.checkbox('Show Outlier Detection', False), show_outliers),
+                (st.checkbox('Show Pivot Table', False), show_pivot_table),
+                (st.checkbox('Show Word Cloud', False), show_wordcloud),
+                (st.checkbox('Show Parallel Coordinates Plot', False), show_parallel_coordinates),
+                (st.checkbox('Show Bubble Plot', False), show_bubble),
+                (st.checkbox('Show Pie Chart', False), show_piechart),
+                (st.checkbox('Show Treemap', False), show_treemap),
+                (st.checkbox('Show 3D Scatter Plot', False), show_3d_scatter),
+                (st.checkbox('Show 3D K-Means Clustering', False), show_3d_kmeans),
+            ]
+
+            # Streaming mode reads the upload in chunks and answers the summary
+            # sections from running accumulators instead of a full DataFrame.
+            # Columnar files need no streaming: they are read column by column.
+            streaming = False
+            filters = []
+            if columnar is None:
+                streaming = st.checkbox('Streaming Ingestion (Large Files)',
+                                        uploaded_file.size > ingest.STREAMING_THRESHOLD_BYTES)
             else:
-                fig = px.scatter_3d(data, x=x_column, y=y_column, z=z_column, color=color_column)
-            
-            st.plotly_chart(fig, use_container_width=True)
+                # A simple comparison pushed down into the reader
+                filter_column = st.selectbox("Filter Rows By", ["None"] + columnar.schema.columns.tolist())
+                if filter_column != "None":
+                    operator = st.selectbox("Condition", ingest.FILTER_OPERATORS)
+                    filter_text = st.text_input("Value")
+                    if filter_text:
+                        try:
+                            value = ingest.coerce_filter_value(columnar.schema[filter_column].dtype, filter_text)
+                            filters = [(filter_column, operator, value)]
+                        except ValueError:
+                            st.warning(f"'{filter_text}' is not a valid value for {filter_column}.")
+            chunksize = ingest.DEFAULT_CHUNKSIZE
+            if streaming:
+                chunksize = st.number_input("Rows per Chunk", min_value=10_000, max_value=5_000_000,
+                                            value=ingest.DEFAULT_CHUNKSIZE, step=10_000)
+            # Parsing and the whole-frame operations run on a multi-threaded
+            # engine when one is installed
+            engine_names = engines.available_engines()
+            engine_name = engine_names[0]
+            if len(engine_names) > 1:
+                engine_name = st.selectbox("Dataframe Engine", engine_names)
+            engine = engines.get_engine(engine_name)
+            # Compaction rewrites pandas frames; Arrow tables already hold text
+            # without per-value objects, and a compacted copy would sit beside
+            # the table (or the memory-mapped store) rather than replace it.
+            compact = st.checkbox('Compact Column Types', False, disabled=not engine.pandas_native,
+                                  help=None if engine.pandas_native else "Only available with the pandas engine.")
+            compact = compact and engine.pandas_native
+            # Sketches answer distinct counts and quartiles on huge columns; small
+            # uploads still get exact values.
+            approximate = st.checkbox('Approximate Statistics (Sketches)', False)
 
-        if show_3d_kmeans:
-            st.subheader("3D K-Means Clustering")
-            numeric_columns = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            x_column = st.selectbox("Select X-axis Column", numeric_columns, key='3d_kmeans_x')
-            y_column = st.selectbox("Select Y-axis Column", numeric_columns, key='3d_kmeans_y')
-            z_column = st.selectbox("Select Z-axis Column", numeric_columns, key='3d_kmeans_z')
-            n_clusters = st.number_input("Select Number of Clusters", min_value=2, max_value=10, value=3, step=1)
-            
-            X = data[[x_column, y_column, z_column]]
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-            kmeans.fit(X)
-            labels = kmeans.labels_
-            
-            fig = px.scatter_3d(data, x=x_column, y=y_column, z=z_column, color=labels.astype(str))
-            st.plotly_chart(fig, use_container_width=True)
+        enabled = [section for shown, section in sections if shown]
+        # Sections that can be answered from the streaming summary alone
+        summary_sections = {show_summary_numeric, show_summary_categorical, show_missing, show_unique_values}
+        needs_rows = any(section not in summary_sections for section in enabled)
+
+        parse_cache = get_parse_cache()
+        digest = upload_digest(uploaded_file)
+
+        summary = None
+        # Filled in once the upload is read, which for columnar files is after the sections
+        compaction_slot = st.container()
+        compaction_report = None
+        needs_summary = any(section in summary_sections for section in enabled)
+        if streaming and needs_summary:
+            summary = parse_cache.get_or_parse(
+                ingest.parse_key(digest, 'summary'),
+                lambda: ingest.summarize_csv_in_chunks(uploaded_file, chunksize=chunksize, compression=compression))
+
+        # An engine working on Arrow tables reads a CSV upload from the shared
+        # dataset store: parsed once, memory-mapped by every session. Columnar
+        # uploads are not stored; their reads are already projected and
+        # filtered per row group, which a full stored copy would undo.
+        if columnar is None:
+            ctx = SectionContext(engine, summary, parse_cache, digest, compact, approximate)
+            if needs_rows or (not streaming and needs_summary):
+                read = lambda: engine.read_csv(uploaded_file, compression=compression)
+                if engine.memory_mappable:
+                    # Remembered so that removing the upload releases the reference
+                    st.session_state['holds_dataset'] = True
+                    table = get_dataset_store().acquire(digest, session_id(), read)
+                    compaction_report = ctx.load('read_csv', lambda: table, cache=False)
+                else:
+                    compaction_report = ctx.load('read_csv', read)
+        else:
+            # Results computed from filtered rows are cached apart from the unfiltered ones
+            view = (digest, tuple(filters)) if filters else digest
+            ctx = SectionContext(engine, None, parse_cache, view, compact, approximate,
+                                 schema=columnar.schema, rows=columnar.rows)
+        scheduler = SectionScheduler()
+        for section in enabled:
+            with st.container():
+                section(ctx, scheduler)
+
+        if columnar is not None and enabled:
+            # Only the columns the sections asked for, in file order
+            columns = tuple(col for col in columnar.schema.columns if col in ctx.required)
+            compaction_report = ctx.load(
+                'read_columns', lambda: engine.read_columnar(columnar, columns, filters), columns=columns)
+        if compaction_report is not None:
+            with compaction_slot:
+                show_compaction(compaction_report)
+        scheduler.render_as_completed()
 
     else:
-        st.info('Waiting for CSV file to be uploaded.')
+        # A removed upload no longer keeps its dataset mapped. Only a session
+        # that took a reference has anything to release, and the store (and
+        # its directory) is not created just to find that out.
+        if st.session_state.pop('holds_dataset', False):
+            get_dataset_store().release(session_id())
+        st.info('Waiting for a data file to be uploaded.')
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,292 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from accumulators import StreamingSummary
+
+DEFAULT_CHUNKSIZE = 200_000
+STREAMING_THRESHOLD_BYTES = 200 * 1024 * 1024
+HASH_BLOCK_BYTES = 8 * 1024 * 1024
+# Memory budget for parsed uploads kept across reruns, overridable per deployment
+PARSE_CACHE_BUDGET_MB = int(os.environ.get('AUTOEDA_PARSE_CACHE_MB', 2048))
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Uploads are told apart by extension: CSV (plain or compressed) always, and
+# the columnar formats when pyarrow is there to read them
+CSV_COMPRESSION = {'.gz': 'gzip', '.zst': 'zstd'}
+COLUMNAR_FORMATS = {'.parquet': 'parquet', '.feather': 'feather', '.arrow': 'feather', '.ipc': 'feather'}
+UPLOAD_TYPES = ['csv', 'gz', 'zst'] + (['parquet', 'feather', 'arrow', 'ipc'] if HAS_PYARROW else [])
+# Comparisons a row filter can push down to a columnar file
+FILTER_OPERATORS = ['==', '!=', '<', '<=', '>', '>=']
+
+
+# Content hash of an upload; the same bytes always map to the same key no
+# matter what the file was called.
+def content_hash(source):
+    digest = hashlib.blake2b(digest_size=16)
+    if hasattr(source, 'getbuffer'):
+        view = source.getbuffer()
+        for start in range(0, len(view), HASH_BLOCK_BYTES):
+            digest.update(view[start:start + HASH_BLOCK_BYTES])
+        view.release()
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+def parse_key(digest, kind, **options):
+    return (digest, kind, tuple(sorted(options.items())))
+
+
+def estimate_nbytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(item) for item in value)
+    return int(getattr(value, 'nbytes', 0))
+
+
+# Marks a key absent from the cache, since None is a value that can be cached
+_MISSING = object()
+
+
+# Parsed uploads keyed by parse_key(), evicted least-recently-used first once
+# the total size passes the budget. One instance is shared by every session
+# and by the section worker threads, so all access goes through the lock, and
+# a key being parsed is parsed once: other callers wait for that result.
+class ParseCache:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.used_bytes -= self._entries.pop(key)[1]
+            # Anything larger than the whole budget would only flush the cache
+            if size > self.budget_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.used_bytes += size
+            self._evict()
+        return value
+
+    # A cached None (a section with nothing to show) counts as cached
+    def get_or_parse(self, key, parse):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            done = self._pending.get(key)
+            owner = done is None
+            if owner:
+                done = self._pending[key] = threading.Event()
+        if not owner:
+            done.wait()
+            value = self.get(key, _MISSING)
+            # Not cached (over budget, or the parse failed): parse it here
+            return value if value is not _MISSING else self.put(key, parse())
+        try:
+            return self.put(key, parse())
+        finally:
+            with self._lock:
+                del self._pending[key]
+            done.set()
+
+    def _evict(self):
+        while self.used_bytes > self.budget_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.used_bytes -= size
+
+
+# File format of an upload from its name, with the compression of a CSV
+def upload_format(name):
+    suffix = os.path.splitext(name.lower())[1]
+    if suffix in COLUMNAR_FORMATS:
+        return COLUMNAR_FORMATS[suffix], None
+    return 'csv', CSV_COMPRESSION.get(suffix)
+
+
+def _open_csv(source, compression):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    # pandas decodes zstd only with the zstandard package; pyarrow ships the codec
+    if compression == 'zstd' and HAS_PYARROW:
+        import pyarrow as pa
+        raw = pa.py_buffer(source.getbuffer()) if hasattr(source, 'getbuffer') else source
+        return pa.input_stream(raw, compression='zstd'), None
+    return source, compression
+
+
+# Filter value typed text as the filtered column's type, so that numbers
+# compare as numbers; raises ValueError when the text does not parse
+def coerce_filter_value(dtype, text):
+    text = text.strip()
+    if pd.api.types.is_bool_dtype(dtype):
+        return text.lower() in ('true', '1', 'yes')
+    if pd.api.types.is_numeric_dtype(dtype):
+        value = float(text)
+        return int(value) if pd.api.types.is_integer_dtype(dtype) and value.is_integer() else value
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return pd.Timestamp(text)
+    return text
+
+
+# Read a CSV upload in bounded chunks and fold every chunk into a
+# StreamingSummary, so peak memory is one chunk rather than the whole file.
+# pandas types each chunk on its own, so a column that reads as numbers in the
+# first chunks can turn to text later; the file is then read again from the
+# start with those columns read as text.
+def summarize_csv_in_chunks(source, chunksize=DEFAULT_CHUNKSIZE, compression=None):
+    text_columns = set()
+    passes = 0
+    while True:
+        passes += 1
+        summary = StreamingSummary(passes)
+        stream, stream_compression = _open_csv(source, compression)
+        changed = []
+        dtype = {col: str for col in text_columns} or None
+        with pd.read_csv(stream, chunksize=chunksize, compression=stream_compression, dtype=dtype) as reader:
+            for chunk in reader:
+                changed = summary.update(chunk)
+                if changed:
+                    break
+        if not changed:
+            return summary
+        text_columns.update(changed)
+
+
+def read_csv(source, compression=None, **options):
+    source, compression = _open_csv(source, compression)
+    return pd.read_csv(source, compression=compression, **options)
+
+
+# Rows of an Arrow table meeting every (column, operator, value) filter
+def filter_table(table, filters):
+    if not filters:
+        return table
+    import pyarrow.parquet as pq
+
+    return table.filter(pq.filters_to_expression([tuple(condition) for condition in filters]))
+
+
+# A Parquet or Feather (Arrow IPC) upload. The schema and row count come from
+# the file footer, so the page can be laid out before any data is read; read()
+# then decodes only the requested columns, and the Parquet reader skips every
+# row group whose min/max statistics rule the filters out.
+class ColumnarSource:
+    def __init__(self, source, file_format):
+        if not HAS_PYARROW:
+            raise ImportError("Parquet and Feather uploads require pyarrow.")
+        import pyarrow.ipc
+        import pyarrow.parquet as pq
+
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        self.source = source
+        self.format = file_format
+        if file_format == 'parquet':
+            parquet_file = pq.ParquetFile(source)
+            arrow_schema = parquet_file.schema_arrow
+            self.rows = parquet_file.metadata.num_rows
+        else:
+            reader = pyarrow.ipc.open_file(source)
+            arrow_schema = reader.schema
+            self.rows = reader.count_rows()
+        # Empty frame with the dtypes the columns will have once read
+        self.schema = arrow_schema.empty_table().to_pandas()
+
+    # filters are (column, operator, value) triples, all of which must hold
+    def read_table(self, columns=None, filters=()):
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+
+        columns = list(self.schema.columns if columns is None else columns)
+        filters = [tuple(condition) for condition in filters]
+        if hasattr(self.source, 'seek'):
+            self.source.seek(0)
+        if self.format == 'parquet':
+            table = pq.read_table(self.source, columns=columns, filters=filters or None)
+        else:
+            filter_columns = [col for col, _, _ in filters if col not in columns]
+            table = filter_table(feather.read_table(self.source, columns=columns + filter_columns), filters)
+            table = table.select(columns)
+        return table
+
+    def read(self, columns=None, filters=()):
+        return self.read_table(columns, filters).to_pandas()
+
+
+def _compact_column(values, category_ratio, arrow_strings):
+    if pd.api.types.is_integer_dtype(values) and not pd.api.types.is_extension_array_dtype(values):
+        return pd.to_numeric(values, downcast='integer')
+    if pd.api.types.is_float_dtype(values) and values.dtype != np.float32:
+        # Only keep float32 when every value survives the round trip
+        narrowed = values.astype('float32')
+        if np.array_equal(narrowed.to_numpy(dtype='float64'), values.to_numpy(dtype='float64'), equal_nan=True):
+            return narrowed
+        return values
+    is_text = values.dtype == object or isinstance(values.dtype, pd.StringDtype)
+    if is_text and pd.api.types.infer_dtype(values, skipna=True) == 'string':
+        distinct = values.nunique(dropna=True)
+        if len(values) and distinct <= category_ratio * len(values):
+            return values.astype('category')
+        if arrow_strings and values.dtype != pd.StringDtype('pyarrow'):
+            return values.astype(pd.StringDtype('pyarrow'))
+    return values
+
+
+# Shrink a parsed frame without changing any value: integers and floats are
+# downcast where lossless, low-cardinality text becomes categorical and the
+# remaining text moves to Arrow-backed strings when pyarrow is installed.
+# Returns the compacted frame plus a per-column memory report.
+def compact_dtypes(data, category_ratio=CATEGORY_RATIO, arrow_strings=True):
+    arrow_strings = arrow_strings and HAS_PYARROW
+    compacted = {}
+    rows = []
+    for col in data.columns:
+        before = data[col]
+        after = _compact_column(before, category_ratio, arrow_strings)
+        compacted[col] = after
+        rows.append({
+            'Column': col,
+            'Dtype Before': str(before.dtype),
+            'Dtype After': str(after.dtype),
+            'Memory Before (KB)': before.memory_usage(index=False, deep=True) / 1024,
+            'Memory After (KB)': after.memory_usage(index=False, deep=True) / 1024,
+        })
+    report = pd.DataFrame(rows).set_index('Column')
+    report['Saved (%)'] = 100 * (1 - report['Memory After (KB)'] / report['Memory Before (KB)'].where(report['Memory Before (KB)'] > 0))
+    return pd.DataFrame(compacted, index=data.index), report
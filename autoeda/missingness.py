@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+MISSINGNESS_BINS = 200
+# Rows unpacked at a time when building the nullity co-occurrence matrix
+UNPACK_BLOCK_ROWS = 1_000_000
+
+# Number of set bits in every possible byte
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+# Null mask of a whole frame packed 8 rows per byte (rows along axis 0), so a
+# 10M x 50 upload costs about 60 MB instead of 500 MB of booleans. Built once
+# per upload; the binned image and nullity correlation are both read from it.
+class NullBitmap:
+    def __init__(self, data):
+        self.columns = list(data.columns)
+        self.rows = len(data)
+        self.packed = np.packbits(data.isna().to_numpy(), axis=0)
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    def counts(self):
+        return pd.Series(_POPCOUNT[self.packed].sum(axis=0, dtype=np.int64), index=self.columns)
+
+    # Share of missing values per column in each of about `bins` contiguous row
+    # ranges. Bin edges fall on byte boundaries so every bin is a slice of the
+    # packed array and is counted with a popcount table lookup.
+    def binned(self, bins=MISSINGNESS_BINS):
+        byte_rows = self.packed.shape[0]
+        if byte_rows == 0:
+            return pd.DataFrame(columns=self.columns, dtype='float64')
+        starts = np.unique(np.linspace(0, byte_rows, min(bins, byte_rows) + 1).astype(np.int64))[:-1]
+        missing = np.add.reduceat(_POPCOUNT[self.packed], starts, axis=0, dtype=np.int64)
+        first_row = starts * 8
+        last_row = np.minimum(np.append(starts[1:], byte_rows) * 8, self.rows)
+        fractions = missing / (last_row - first_row)[:, None]
+        labels = [f"{lo + 1:,}-{hi:,}" for lo, hi in zip(first_row, last_row)]
+        return pd.DataFrame(fractions, index=labels, columns=self.columns)
+
+    # Correlation between the null indicators of every pair of columns, as in
+    # missingno's heatmap. Co-occurrence counts come from unpacked blocks and a
+    # matrix product; columns never or always missing are left out.
+    def nullity_correlation(self):
+        counts = self.counts().to_numpy().astype('float64')
+        partial = (counts > 0) & (counts < self.rows)
+        packed = self.packed[:, partial]
+        columns = [col for col, keep in zip(self.columns, partial) if keep]
+        both = np.zeros((len(columns), len(columns)))
+        block_bytes = UNPACK_BLOCK_ROWS // 8
+        for start in range(0, packed.shape[0], block_bytes):
+            block = np.unpackbits(packed[start:start + block_bytes], axis=0).astype(np.float32)
+            both += (block.T @ block).astype('float64')
+        n = float(self.rows)
+        c = counts[partial]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = (n * both - np.outer(c, c)) / np.sqrt(np.outer(c * (n - c), c * (n - c)))
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=columns, columns=columns)
@@ -0,0 +1,118 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+from clustering import feature_matrix
+from pools import process_context
+
+IQR_MULTIPLIER = 1.5
+OUTLIER_PAGE_ROWS = 100
+# Rows compared against the fences at a time
+SCAN_BLOCK_ROWS = 1_000_000
+# IsolationForest is trained on a sample of this many rows and then scores the
+# full data block by block
+ISOLATION_SAMPLE_ROWS = 100_000
+ISOLATION_BLOCK_ROWS = 500_000
+
+
+def exact_quartiles(data, columns):
+    quartiles = data[columns].quantile([0.25, 0.75]).T
+    quartiles.columns = ['Q1', 'Q3']
+    return quartiles
+
+
+# Tukey fences for every column from a frame of first and third quartiles
+def iqr_fences(quartiles, multiplier=IQR_MULTIPLIER):
+    iqr = quartiles['Q3'] - quartiles['Q1']
+    fences = quartiles.copy()
+    fences['Lower Fence'] = quartiles['Q1'] - multiplier * iqr
+    fences['Upper Fence'] = quartiles['Q3'] + multiplier * iqr
+    return fences
+
+
+# Outliers of every numeric column in one vectorized pass: the values are
+# compared against all fences at once, block by block. Only the rows with at
+# least one outlier are kept, together with which of their columns are out.
+class OutlierScan:
+    def __init__(self, data, quartiles, block_rows=SCAN_BLOCK_ROWS):
+        self.fences = iqr_fences(quartiles)
+        self.columns = self.fences.index.tolist()
+        lower = self.fences['Lower Fence'].to_numpy()
+        upper = self.fences['Upper Fence'].to_numpy()
+        rows, masks = [], []
+        for start in range(0, len(data), block_rows):
+            values = data.iloc[start:start + block_rows][self.columns].to_numpy(dtype='float64', na_value=np.nan)
+            outside = (values < lower) | (values > upper)
+            hit = np.flatnonzero(outside.any(axis=1))
+            rows.append(hit + start)
+            masks.append(outside[hit])
+        self.rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        self.mask = np.concatenate(masks) if masks else np.empty((0, len(self.columns)), dtype=bool)
+        self.total_rows = len(data)
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + self.mask.nbytes
+
+    def table(self):
+        table = self.fences.copy()
+        table['Outliers'] = self.mask.sum(axis=0)
+        table['Outliers (%)'] = table['Outliers'] / max(self.total_rows, 1) * 100
+        return table
+
+    # Row positions of the outliers in one column, or in any column
+    def outlier_rows(self, column=None):
+        if column is None:
+            return self.rows
+        return self.rows[self.mask[:, self.columns.index(column)]]
+
+    def page(self, data, column=None, page=0, page_rows=OUTLIER_PAGE_ROWS):
+        rows = self.outlier_rows(column)
+        return data.iloc[rows[page * page_rows:(page + 1) * page_rows]]
+
+
+def _fit_isolation_forest(sample, contamination, seed):
+    model = IsolationForest(contamination=contamination, random_state=seed, n_jobs=1)
+    return model.fit(sample)
+
+
+# Multivariate outliers from an IsolationForest. The forest is trained on a
+# sample of the complete rows in a separate worker process, so the fit does
+# not hold up the server, and the fitted model then scores every complete row
+# in blocks. Lower scores are more anomalous.
+class IsolationScan:
+    def __init__(self, data, columns, contamination='auto', sample_rows=ISOLATION_SAMPLE_ROWS,
+                 block_rows=ISOLATION_BLOCK_ROWS, seed=0):
+        self.columns, matrix, self.rows = feature_matrix(data, columns)
+        sample = matrix
+        if len(matrix) > sample_rows:
+            rng = np.random.default_rng(seed)
+            sample = matrix[np.sort(rng.choice(len(matrix), sample_rows, replace=False))]
+        self.scores = np.empty(0, dtype=np.float32)
+        if len(matrix):
+            with ProcessPoolExecutor(max_workers=1, mp_context=process_context()) as pool:
+                model = pool.submit(_fit_isolation_forest, sample, contamination, seed).result()
+            self.scores = np.concatenate([
+                model.decision_function(matrix[start:start + block_rows])
+                for start in range(0, len(matrix), block_rows)
+            ]).astype(np.float32)
+        self.outliers = self.scores < 0
+        self.sampled = len(sample) < len(matrix)
+        flagged = np.flatnonzero(self.outliers)
+        self.ranked = flagged[np.argsort(self.scores[flagged], kind='stable')]
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + self.scores.nbytes + self.outliers.nbytes + self.ranked.nbytes
+
+    @property
+    def outlier_count(self):
+        return int(self.outliers.sum())
+
+    # Outlier rows, most anomalous first, with their anomaly score
+    def page(self, data, page=0, page_rows=OUTLIER_PAGE_ROWS):
+        flagged = self.ranked[page * page_rows:(page + 1) * page_rows]
+        shown = data.iloc[self.rows[flagged]].copy()
+        shown.insert(0, 'Anomaly Score', self.scores[flagged])
+        return shown
@@ -0,0 +1,50 @@
+import operator
+
+import numpy as np
+
+# Rows per page offered by the dataset viewer
+PAGE_SIZES = [25, 50, 100, 500, 1000]
+DEFAULT_PAGE_SIZE = 100
+
+# The viewer's row filters, one per ingest.FILTER_OPERATORS entry
+COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+# The rows the viewer pages through: every row in file order, or the row
+# positions in display order built from a cached sort permutation (order) and
+# a cached filter mask (keep). Filtering the permutation keeps it sorted, so
+# neither is recomputed when the other changes, and a page is a slice of the
+# positions rather than a sort or scan of the frame.
+class RowView:
+    def __init__(self, rows, order=None, keep=None):
+        if keep is None:
+            self.positions = order
+        elif order is None:
+            self.positions = np.flatnonzero(keep)
+        else:
+            self.positions = order[keep[order]]
+        self.rows = rows if self.positions is None else len(self.positions)
+
+    @property
+    def nbytes(self):
+        return 0 if self.positions is None else self.positions.nbytes
+
+    def page_count(self, page_size):
+        return max(1, -(-self.rows // page_size))
+
+    # Row positions of a 1-based page, with the page number clamped to the
+    # last page so a view that shrinks never shows an empty page
+    def page(self, page, page_size):
+        page = min(max(page, 1), self.page_count(page_size))
+        start = (page - 1) * page_size
+        stop = min(start + page_size, self.rows)
+        if self.positions is None:
+            return page, np.arange(start, stop, dtype=np.int64)
+        return page, self.positions[start:stop]
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Above this many rows the point plots switch to a reduced representation
+LARGE_PLOT_ROWS = 200_000
+HISTOGRAM_BINS = 20
+MAX_HISTOGRAM_BINS = 1000
+PAIR_GRID_BINS = 50
+MAX_SAMPLE_POINTS = 50_000
+GRID_BINS_2D = 200
+GRID_BINS_3D = 30
+SAMPLE_BINS = 50
+
+
+def _finite_rows(data, columns):
+    columns = list(dict.fromkeys(columns))
+    values = data[columns].apply(pd.to_numeric, errors='coerce')
+    return values[np.isfinite(values.to_numpy(dtype='float64', na_value=np.nan)).all(axis=1)]
+
+
+def _iqr_outliers(values):
+    q1, q3 = np.quantile(values, [0.25, 0.75], axis=0)
+    iqr = q3 - q1
+    return ((values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)).any(axis=1)
+
+
+# Downsample rows to about max_points while keeping the shape of the data:
+# every IQR outlier (up to half the budget) is kept, and the rest of the
+# budget is spread over a grid on the first two columns in proportion to each
+# cell's population, with at least one point per occupied cell.
+def stratified_sample(data, columns, max_points=MAX_SAMPLE_POINTS, bins=SAMPLE_BINS, seed=0):
+    frame = _finite_rows(data, columns)
+    if len(frame) <= max_points:
+        return frame
+    rng = np.random.default_rng(seed)
+    values = frame.to_numpy(dtype='float64')
+
+    outliers = np.flatnonzero(_iqr_outliers(values))
+    if len(outliers) > max_points // 2:
+        outliers = rng.choice(outliers, max_points // 2, replace=False)
+    budget = max_points - len(outliers)
+
+    cells = np.zeros(len(values), dtype=np.int64)
+    for j in range(min(2, values.shape[1])):
+        edges = np.linspace(values[:, j].min(), values[:, j].max(), bins + 1)
+        cells = cells * bins + np.clip(np.searchsorted(edges, values[:, j], side='right') - 1, 0, bins - 1)
+    _, cell_index, cell_sizes = np.unique(cells, return_inverse=True, return_counts=True)
+    quota = np.maximum(1, np.floor(cell_sizes * budget / len(values))).astype(np.int64)
+
+    # Shuffle, then keep the first quota[cell] rows of every cell
+    order = np.lexsort((rng.random(len(values)), cell_index))
+    starts = np.concatenate(([0], np.cumsum(cell_sizes)[:-1]))
+    rank_in_cell = np.arange(len(values)) - starts[cell_index[order]]
+    picked = order[rank_in_cell < quota[cell_index[order]]]
+
+    keep = np.union1d(picked, outliers)
+    return frame.iloc[keep]
+
+
+# Counts (or the mean of a weight column) on a regular 2D grid
+def density_grid_2d(data, x, y, weight=None, bins=GRID_BINS_2D):
+    columns = [x, y] + ([weight] if weight is not None else [])
+    frame = _finite_rows(data, columns)
+    counts, xedges, yedges = np.histogram2d(frame[x], frame[y], bins=bins)
+    means = None
+    if weight is not None:
+        totals, _, _ = np.histogram2d(frame[x], frame[y], bins=[xedges, yedges], weights=frame[weight])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = totals / counts
+    return {'counts': counts, 'means': means, 'edges': [xedges, yedges], 'rows': len(frame)}
+
+
+def density_grid_3d(data, x, y, z, weight=None, bins=GRID_BINS_3D):
+    columns = [x, y, z] + ([weight] if weight is not None else [])
+    frame = _finite_rows(data, columns)
+    counts, edges = np.histogramdd(frame[[x, y, z]].to_numpy(), bins=bins)
+    means = None
+    if weight is not None:
+        totals, _ = np.histogramdd(frame[[x, y, z]].to_numpy(), bins=edges, weights=frame[weight].to_numpy())
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = totals / counts
+    return {'counts': counts, 'means': means, 'edges': edges, 'rows': len(frame)}
+
+
+def _centers(edges):
+    return (edges[:-1] + edges[1:]) / 2
+
+
+# Bin one column on the server. bins is a bin count or 'fd' for the
+# Freedman-Diaconis rule, which is capped so a long tail cannot produce
+# millions of empty bins.
+def histogram(values, bins=HISTOGRAM_BINS):
+    arr = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    arr = arr[np.isfinite(arr)]
+    if bins == 'fd' and arr.size:
+        edges = np.histogram_bin_edges(arr, bins='fd')
+        bins = edges if len(edges) - 1 <= MAX_HISTOGRAM_BINS else MAX_HISTOGRAM_BINS
+    elif bins == 'fd':
+        bins = HISTOGRAM_BINS
+    counts, edges = np.histogram(arr, bins=bins)
+    return {'counts': counts, 'edges': edges, 'rows': int(arr.size)}
+
+
+# Bar trace of precomputed bin counts; its size depends on the bin count only
+def histogram_figure(hist, column):
+    edges = hist['edges']
+    fig = go.Figure(go.Bar(
+        x=_centers(edges), y=hist['counts'], width=np.diff(edges),
+        customdata=np.stack([edges[:-1], edges[1:]], axis=1),
+        hovertemplate=f'{column}: %{{customdata[0]:.4g}} to %{{customdata[1]:.4g}}<br>count: %{{y}}<extra></extra>'))
+    fig.update_layout(xaxis_title=column, yaxis_title='count', bargap=0)
+    return fig
+
+
+def density_heatmap_figure(grid, x, y, color=None):
+    values = grid['counts'] if color is None else grid['means']
+    # Empty cells stay transparent instead of drawing as the lowest color
+    z = np.where(grid['counts'] > 0, values, np.nan).T
+    xedges, yedges = grid['edges']
+    fig = go.Figure(go.Heatmap(
+        x=_centers(xedges), y=_centers(yedges), z=z,
+        colorscale='Viridis', colorbar={'title': 'Rows' if color is None else f'Mean {color}'},
+        hovertemplate=f'{x}: %{{x}}<br>{y}: %{{y}}<br>value: %{{z}}<extra></extra>'))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+# Occupied cells of a grid as points at the cell centers
+def grid_points(grid, axes):
+    counts = grid['counts']
+    occupied = np.nonzero(counts)
+    centers = [_centers(edges)[idx] for edges, idx in zip(grid['edges'], occupied)]
+    points = pd.DataFrame(dict(zip(axes, centers)))
+    points['Rows'] = counts[occupied]
+    if grid['means'] is not None:
+        points['Mean'] = grid['means'][occupied]
+    return points
+
+
+def density_scatter_3d_figure(grid, x, y, z, color=None):
+    points = grid_points(grid, [x, y, z])
+    marker_size = 4 + 16 * np.cbrt(points['Rows'] / points['Rows'].max())
+    fig = go.Figure(go.Scatter3d(
+        x=points[x], y=points[y], z=points[z], mode='markers',
+        marker={'size': marker_size, 'color': points['Rows'] if color is None else points['Mean'],
+                'colorscale': 'Viridis', 'opacity': 0.7,
+                'colorbar': {'title': 'Rows' if color is None else f'Mean {color}'}},
+        customdata=points['Rows'],
+        hovertemplate='rows: %{customdata}<extra></extra>'))
+    fig.update_layout(scene={'xaxis_title': x, 'yaxis_title': y, 'zaxis_title': z})
+    return fig
+
+
+# Bin index of every row for one column (-1 where missing), on the same
+# linear edges np.histogram uses, so the diagonal histograms line up.
+def bin_index(values, bins=PAIR_GRID_BINS):
+    arr = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    finite = np.isfinite(arr)
+    if not finite.any():
+        return np.full(arr.size, -1, dtype=np.int32), np.linspace(0.0, 1.0, bins + 1)
+    edges = np.histogram_bin_edges(arr[finite], bins=bins)
+    index = np.full(arr.size, -1, dtype=np.int32)
+    index[finite] = np.clip(np.searchsorted(edges, arr[finite], side='right') - 1, 0, bins - 1)
+    return index, edges
+
+
+# 2D counts for one column pair from precomputed bin indices: one bincount
+# over the combined index instead of re-binning the raw values.
+def pair_grid(index_x, index_y, bins=PAIR_GRID_BINS):
+    valid = (index_x >= 0) & (index_y >= 0)
+    combined = index_x[valid].astype(np.int64) * bins + index_y[valid]
+    return np.bincount(combined, minlength=bins * bins).reshape(bins, bins)
+
+
+# Counts for every ordered pair of the columns: one bincount per unordered
+# pair, the mirrored pair getting the transposed grid
+def pair_grids(indexes, columns, bins=PAIR_GRID_BINS):
+    grids = {}
+    for i, x in enumerate(columns):
+        for y in columns[i + 1:]:
+            grids[(x, y)] = pair_grid(indexes[x], indexes[y], bins)
+            grids[(y, x)] = grids[(x, y)].T
+    return grids
+
+
+# k x k grid of density heatmaps with the 1D histograms on the diagonal
+def pair_plot_figure(columns, grids, edges, hists):
+    k = len(columns)
+    fig = make_subplots(rows=k, cols=k, horizontal_spacing=0.02, vertical_spacing=0.02)
+    for r, row_col in enumerate(columns):
+        for c, col in enumerate(columns):
+            if r == c:
+                hist = hists[col]
+                fig.add_trace(go.Bar(x=_centers(hist['edges']), y=hist['counts'], width=np.diff(hist['edges']),
+                                     marker_color='#636efa', showlegend=False,
+                                     hovertemplate=f'{col}: %{{x:.4g}}<br>count: %{{y}}<extra></extra>'),
+                              row=r + 1, col=c + 1)
+            else:
+                counts = grids[(col, row_col)]
+                fig.add_trace(go.Heatmap(x=_centers(edges[col]), y=_centers(edges[row_col]),
+                                         z=np.where(counts > 0, counts, np.nan).T,
+                                         colorscale='Viridis', showscale=False,
+                                         hovertemplate=f'{col}: %{{x:.4g}}<br>{row_col}: %{{y:.4g}}<br>rows: %{{z}}<extra></extra>'),
+                              row=r + 1, col=c + 1)
+            if r == k - 1:
+                fig.update_xaxes(title_text=col, row=r + 1, col=c + 1)
+            if c == 0:
+                fig.update_yaxes(title_text=row_col, row=r + 1, col=c + 1)
+    fig.update_layout(height=min(220 * k, 1400), bargap=0)
+    return fig
+
+
+def reduction_caption(total_rows, shown, unit='points'):
+    return f"Large-data mode: {total_rows:,} rows reduced to {shown:,} {unit} before sending to the browser."
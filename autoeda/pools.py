@@ -0,0 +1,8 @@
+import multiprocessing
+
+
+# Context for every process pool of the app and the batch reports: spawn
+# rather than fork, because the Streamlit server process is multi-threaded
+# and a forked child can inherit locks other threads were holding.
+def process_context():
+    return multiprocessing.get_context('spawn')
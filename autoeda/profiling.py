@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+QUANTILES = [0.25, 0.5, 0.75]
+TOP_VALUES = 5
+
+
+# Linear-interpolated quantiles (pandas' default) read straight out of columns
+# that are already sorted with their NaNs at the bottom.
+def sorted_quantiles(ordered, counts, q):
+    pos = q * np.maximum(counts - 1, 0)
+    lo = np.floor(pos).astype(int)
+    hi = np.ceil(pos).astype(int)
+    cols = np.arange(ordered.shape[1])
+    lower = ordered[lo, cols]
+    upper = ordered[hi, cols]
+    result = lower + (upper - lower) * (pos - lo)
+    return np.where(counts > 0, result, np.nan)
+
+
+def top_values_sorted(values, top_n):
+    if values.size == 0:
+        return pd.Series(dtype='int64')
+    starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1))
+    lengths = np.diff(np.append(starts, values.size))
+    order = np.argsort(-lengths, kind='stable')[:top_n]
+    return pd.Series(lengths[order], index=values[starts[order]])
+
+
+# Every numeric column is stacked into one float matrix and sorted once; the
+# sort yields min, max, quartiles, distinct count and the most frequent
+# values, while count, mean and variance come from the same matrix.
+def _profile_numeric(data, columns, top_n):
+    matrix = data[columns].to_numpy(dtype='float64', na_value=np.nan)
+    missing = np.isnan(matrix)
+    counts = (~missing).sum(axis=0)
+    sums = np.where(missing, 0.0, matrix).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        centered = np.where(missing, 0.0, matrix - means)
+        variances = (centered ** 2).sum(axis=0) / (counts - 1)
+    variances = np.where(counts > 1, variances, np.nan)
+
+    # NaNs sort to the bottom, so row 0 is the minimum of every non-empty column
+    ordered = np.sort(matrix, axis=0)
+    if not len(ordered):
+        ordered = np.full((1, len(columns)), np.nan)
+    changes = (ordered[1:] != ordered[:-1]) & ~np.isnan(ordered[1:])
+    distinct = changes.sum(axis=0) + (counts > 0)
+
+    stats = pd.DataFrame({
+        'kind': 'numeric',
+        'count': counts,
+        'nulls': missing.sum(axis=0),
+        'mean': means,
+        'std': np.sqrt(variances),
+        'var': variances,
+        'min': sorted_quantiles(ordered, counts, 0.0),
+        'max': sorted_quantiles(ordered, counts, 1.0),
+        'distinct': distinct,
+    }, index=columns)
+    for q in QUANTILES:
+        stats[f'{q:.0%}'] = sorted_quantiles(ordered, counts, q)
+
+    top_values = {}
+    for j, col in enumerate(columns):
+        top_values[col] = top_values_sorted(ordered[:counts[j], j], top_n)
+    return stats, top_values
+
+
+def _profile_categorical(data, columns, top_n):
+    rows = {}
+    top_values = {}
+    for col in columns:
+        counts = data[col].value_counts(dropna=True)
+        counts = counts[counts > 0]
+        rows[col] = {
+            'kind': 'categorical',
+            'count': int(counts.sum()),
+            'nulls': int(data[col].isna().sum()),
+            'distinct': len(counts),
+        }
+        top_values[col] = counts.head(top_n)
+    return pd.DataFrame.from_dict(rows, orient='index'), top_values
+
+
+# Per-column statistics for a whole frame, computed once per upload and shared
+# by the summary, unique-count, missing-value and outlier sections. Exposes
+# the same views as StreamingSummary so either can back those sections.
+class ColumnProfile:
+    def __init__(self, stats, top_values, rows):
+        self.stats = stats
+        self.top_values = top_values
+        self.rows = rows
+
+    @property
+    def nbytes(self):
+        top_values = sum(values.memory_usage(deep=True) for values in self.top_values.values())
+        return int(self.stats.memory_usage(deep=True).sum() + top_values)
+
+    def numeric_columns(self):
+        return self.stats.index[self.stats['kind'] == 'numeric'].tolist()
+
+    def categorical_columns(self):
+        return self.stats.index[self.stats['kind'] == 'categorical'].tolist()
+
+    def top(self, col):
+        values = self.top_values[col]
+        if values.empty:
+            return np.nan, np.nan
+        return values.index[0], int(values.iloc[0])
+
+    def numeric_summary(self):
+        fields = ['count', 'mean', 'std', 'min'] + [f'{q:.0%}' for q in QUANTILES] + ['max']
+        return self.stats.loc[self.numeric_columns(), fields].T.astype('float64')
+
+    def categorical_summary(self):
+        stats = {}
+        for col in self.categorical_columns():
+            top, freq = self.top(col)
+            stats[col] = {'count': self.stats.at[col, 'count'], 'unique': self.stats.at[col, 'distinct'],
+                          'top': top, 'freq': freq}
+        return pd.DataFrame(stats)
+
+    def unique_counts(self):
+        return self.stats[['distinct']].rename(columns={'distinct': 'Count'}).astype('int64')
+
+    def missing_counts(self):
+        return self.stats['nulls'].astype('int64').rename('Missing')
+
+    def quantile(self, col, q):
+        return self.stats.at[col, f'{q:.0%}']
+
+
+def profile_frame(data, top_n=TOP_VALUES):
+    numeric = [col for col in data.columns
+               if pd.api.types.is_numeric_dtype(data[col]) and not pd.api.types.is_bool_dtype(data[col])]
+    other = [col for col in data.columns if col not in set(numeric)]
+    parts = []
+    top_values = {}
+    if numeric:
+        stats, tops = _profile_numeric(data, numeric, top_n)
+        parts.append(stats)
+        top_values.update(tops)
+    if other:
+        stats, tops = _profile_categorical(data, other, top_n)
+        parts.append(stats)
+        top_values.update(tops)
+    stats = pd.concat(parts) if parts else pd.DataFrame(columns=['kind', 'count', 'nulls', 'distinct'])
+    stats = stats.reindex(data.columns)
+    return ColumnProfile(stats, top_values, len(data))
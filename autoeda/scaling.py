@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from accumulators import MomentAccumulator
+from ingest import DEFAULT_CHUNKSIZE, HAS_PYARROW
+
+SCALERS = ['StandardScaler', 'MinMaxScaler', 'RobustScaler', 'Normalizer']
+PREVIEW_ROWS = 1000
+SCALED_SUFFIX = '_scaled'
+
+
+# Per-column statistics every scaler is fitted from, gathered chunk by chunk
+# with the streaming moment accumulators (scaling never needs distinct
+# counts): mean and variance for StandardScaler, min and max for
+# MinMaxScaler, and the KLL quartiles for RobustScaler (exact below the
+# sketch's raw-value limit, approximate above it).
+class ScalingStats:
+    def __init__(self, data, columns, chunksize=DEFAULT_CHUNKSIZE):
+        self.columns = list(dict.fromkeys(columns))
+        self.accumulators = {col: MomentAccumulator() for col in self.columns}
+        for start in range(0, len(data), chunksize):
+            chunk = data.iloc[start:start + chunksize]
+            for col, acc in self.accumulators.items():
+                acc.update(chunk[col])
+        self.rows = len(data)
+
+    @property
+    def nbytes(self):
+        return sum(acc.nbytes for acc in self.accumulators.values())
+
+    @property
+    def approximate(self):
+        return any(not acc.kll.exact for acc in self.accumulators.values())
+
+    # Offset and scale per column, following the matching scikit-learn scaler:
+    # population standard deviation, and a scale of 1 for constant columns
+    def parameters(self, scaler):
+        accs = [self.accumulators[col] for col in self.columns]
+        if scaler == 'StandardScaler':
+            center = np.array([acc.mean if acc.count else np.nan for acc in accs])
+            scale = np.sqrt(np.array([acc.m2 / acc.count if acc.count else np.nan for acc in accs]))
+        elif scaler == 'MinMaxScaler':
+            center = np.array([acc.min if acc.count else np.nan for acc in accs])
+            scale = np.array([acc.max - acc.min if acc.count else np.nan for acc in accs])
+        elif scaler == 'RobustScaler':
+            quartiles = np.array([acc.kll.quantiles([0.25, 0.5, 0.75]) for acc in accs]).reshape(-1, 3)
+            center = quartiles[:, 1]
+            scale = quartiles[:, 2] - quartiles[:, 0]
+        elif scaler == 'Normalizer':
+            return None
+        else:
+            raise ValueError(f"Unsupported scaler: {scaler}")
+        scale = np.where(scale == 0, 1.0, scale)
+        return pd.DataFrame({'Center': center, 'Scale': scale}, index=self.columns)
+
+    # Scaled copy of some rows. Normalizer is stateless and scales every row to
+    # unit L2 norm; missing values are skipped in the norm and stay missing.
+    def transform(self, frame, scaler):
+        values = frame[self.columns].to_numpy(dtype='float64', na_value=np.nan)
+        if scaler == 'Normalizer':
+            norms = np.sqrt(np.nansum(values ** 2, axis=1, keepdims=True))
+            scaled = values / np.where(norms == 0, 1.0, norms)
+        else:
+            params = self.parameters(scaler)
+            scaled = (values - params['Center'].to_numpy()) / params['Scale'].to_numpy()
+        return pd.DataFrame(scaled, index=frame.index, columns=[f"{col}{SCALED_SUFFIX}" for col in self.columns])
+
+
+# A sampled page of rows, original and scaled side by side. Page p draws the
+# same rows every time, so paging back and forth is stable.
+def preview(data, stats, scaler, page=0, rows=PREVIEW_ROWS):
+    if len(data) > rows:
+        picked = np.sort(np.random.default_rng(page).choice(len(data), rows, replace=False))
+        frame = data.iloc[picked]
+    else:
+        frame = data
+    return pd.concat([frame[stats.columns], stats.transform(frame, scaler)], axis=1)
+
+
+# Write the selected columns and their scaled versions to a Parquet file one
+# chunk (row group) at a time, so the transformed dataset never exists in
+# memory at once.
+def export_parquet(data, stats, scaler, path, chunksize=DEFAULT_CHUNKSIZE):
+    if not HAS_PYARROW:
+        raise ImportError("Parquet export requires pyarrow.")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for start in range(0, max(len(data), 1), chunksize):
+            chunk = data.iloc[start:start + chunksize]
+            table = pa.Table.from_pandas(pd.concat([chunk[stats.columns], stats.transform(chunk, scaler)], axis=1),
+                                         preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy.stats import spearmanr
+from sklearn.feature_selection import f_regression, mutual_info_regression
+
+# Rows used per column by the mutual information scorer (a k-nearest-neighbour
+# estimate that grows faster than linearly with the row count)
+MI_SAMPLE_ROWS = 100_000
+
+
+def _complete(x, y):
+    keep = np.isfinite(x) & np.isfinite(y)
+    return x[keep], y[keep]
+
+
+def _f_score(x, y):
+    x, y = _complete(x, y)
+    if len(x) < 3 or x.min() == x.max():
+        return np.nan
+    return float(f_regression(x[:, None], y)[0][0])
+
+
+def _mutual_information(x, y, seed=0):
+    x, y = _complete(x, y)
+    if len(x) < 4:
+        return np.nan
+    if len(x) > MI_SAMPLE_ROWS:
+        keep = np.random.default_rng(seed).choice(len(x), MI_SAMPLE_ROWS, replace=False)
+        x, y = x[keep], y[keep]
+    return float(mutual_info_regression(x[:, None], y, random_state=seed)[0])
+
+
+def _spearman(x, y):
+    x, y = _complete(x, y)
+    if len(x) < 3:
+        return np.nan
+    return float(spearmanr(x, y)[0])
+
+
+# Scorers run per column on its rows complete in both the column and the
+# target; the F-statistic is cheap enough to run in process, the others are
+# spread over worker processes.
+SCORERS = {
+    'F-Statistic': _f_score,
+    'Mutual Information': _mutual_information,
+    'Spearman Correlation': _spearman,
+}
+PARALLEL_SCORERS = {'Mutual Information', 'Spearman Correlation'}
+
+
+# Score of every numeric column against a numeric target, sorted so that the
+# top k features are the first k rows (by absolute value for the signed
+# Spearman correlation). Scores do not depend on k, so one call per target
+# and scorer serves every k.
+def feature_scores(data, target, scorer='F-Statistic', n_jobs=-1):
+    features = [col for col in data.select_dtypes(include=['number']).columns if col != target]
+    y = pd.to_numeric(data[target], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    columns = (data[col].to_numpy(dtype='float64', na_value=np.nan) for col in features)
+    score = SCORERS[scorer]
+    if scorer in PARALLEL_SCORERS and len(features) > 1:
+        scores = Parallel(n_jobs=n_jobs)(delayed(score)(x, y) for x in columns)
+    else:
+        scores = [score(x, y) for x in columns]
+    result = pd.DataFrame({'Feature': features, 'Score': np.asarray(scores, dtype='float64')})
+    order = result['Score'].abs().sort_values(ascending=False, na_position='last').index
+    return result.loc[order].reset_index(drop=True)
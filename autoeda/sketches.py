@@ -0,0 +1,183 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+HLL_PRECISION = 14
+KLL_K = 200
+# Below this many values the exact answer is cheap enough to compute directly
+EXACT_THRESHOLD = 1_000_000
+# Streaming accumulators hold at most this many raw values per column before
+# switching to a sketch, which keeps memory bounded across many columns
+STREAMING_EXACT_LIMIT = 100_000
+UPDATE_BLOCK = 1_000_000
+
+# An estimate together with its error bound. For distinct counts the error is
+# the absolute standard error; for quantiles it is the normalized rank error.
+Estimate = namedtuple('Estimate', ['value', 'error', 'exact'])
+
+
+def _non_null(values):
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    return values[values.notna()]
+
+
+# HyperLogLog distinct counter over 64-bit pandas hashes. Registers merge by
+# elementwise max, so sketches built over separate chunks combine exactly.
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values):
+        values = _non_null(values)
+        for start in range(0, len(values), UPDATE_BLOCK):
+            self._add_hashes(pd.util.hash_pandas_object(values.iloc[start:start + UPDATE_BLOCK], index=False).to_numpy())
+
+    def _add_hashes(self, hashes):
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # rest < 2**53 is exact in float64, so frexp's exponent is its bit length
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (width - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return raw
+
+    def result(self):
+        value = self.estimate()
+        return Estimate(int(round(value)), value * self.relative_error, False)
+
+
+# KLL quantile sketch: a stack of compactors where level h holds items of
+# weight 2**h. A full level is sorted and every other item (random offset) is
+# promoted, so space stays around 3k items while the rank error stays ~1/k.
+class KLLSketch:
+    def __init__(self, k=KLL_K, seed=None, exact_limit=0):
+        self.k = k
+        self.exact_limit = exact_limit
+        self.n = 0
+        self.compactors = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.compactors)
+
+    @property
+    def exact(self):
+        return len(self.compactors) == 1
+
+    @property
+    def rank_error(self):
+        # Empirical single-sided bound at 99% confidence (Apache DataSketches)
+        return 0.0 if self.exact else 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        arr = pd.to_numeric(_non_null(values), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        arr = arr[~np.isnan(arr)]
+        if arr.size == 0:
+            return
+        self.n += arr.size
+        self.compactors[0] = np.concatenate([self.compactors[0], arr])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        # Raw values are kept as they are until there are more than exact_limit
+        if len(self.compactors) == 1 and len(self.compactors[0]) <= self.exact_limit:
+            return
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                items = np.sort(items)
+                keep = items[len(items) - len(items) % 2:]
+                promoted = items[self._rng.integers(2):len(items) - len(items) % 2:2]
+                self.compactors[level] = keep
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+                # Adding a level shrinks every lower capacity, so rescan from the bottom
+                level = 0
+                continue
+            level += 1
+
+    def quantiles(self, qs):
+        items = np.concatenate(self.compactors)
+        if items.size == 0:
+            return np.full(len(qs), np.nan)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.compactors)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        if self.exact:
+            return np.quantile(items, qs)
+        cumulative = np.cumsum(weights[order])
+        targets = np.asarray(qs) * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side='left')
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def results(self, qs):
+        return [Estimate(value, self.rank_error, self.exact) for value in self.quantiles(qs)]
+
+
+# Distinct count of one column, exact for small inputs and HyperLogLog above
+# the threshold.
+def approximate_distinct(values, exact_threshold=EXACT_THRESHOLD, precision=HLL_PRECISION):
+    if len(values) <= exact_threshold:
+        return Estimate(int(values.nunique(dropna=True)), 0.0, True)
+    sketch = HyperLogLog(precision)
+    sketch.update(values)
+    return sketch.result()
+
+
+# Quantiles of one numeric column, exact for small inputs and from a KLL
+# sketch above the threshold.
+def approximate_quantiles(values, qs, exact_threshold=EXACT_THRESHOLD, k=KLL_K):
+    if len(values) <= exact_threshold:
+        exact = values.quantile(qs).to_numpy()
+        return [Estimate(value, 0.0, True) for value in exact]
+    sketch = KLLSketch(k, seed=0)
+    for start in range(0, len(values), UPDATE_BLOCK):
+        sketch.update(values.iloc[start:start + UPDATE_BLOCK])
+    return sketch.results(qs)
+
+
+# Approximate distinct counts for every column with their error bounds, laid
+# out like the exact "Unique Values Count" table.
+def approximate_unique_counts(data, exact_threshold=EXACT_THRESHOLD):
+    rows = {}
+    for col in data.columns:
+        estimate = approximate_distinct(data[col], exact_threshold)
+        rows[col] = {'Count': estimate.value, '± Std. Error': estimate.error, 'Exact': estimate.exact}
+    return pd.DataFrame.from_dict(rows, orient='index')
@@ -0,0 +1,138 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from ingest import HAS_PYARROW
+
+# Where parsed uploads are persisted, shared by every session and every server
+# process on the machine
+STORE_DIR = os.environ.get('AUTOEDA_STORE_DIR', os.path.join(tempfile.gettempdir(), 'autoeda-store'))
+# A session that has not touched its dataset for this long drops its
+# reference; a dataset nobody references for this long is unmapped and deleted
+STORE_IDLE_SECONDS = int(os.environ.get('AUTOEDA_STORE_IDLE_SECONDS', 30 * 60))
+STORE_SUFFIX = '.arrow'
+
+
+class _Entry:
+    def __init__(self, path, table):
+        self.path = path
+        self.table = table
+        self.sessions = {}
+        self.last_used = time.time()
+
+
+# Parsed uploads persisted once as uncompressed Arrow IPC files named by the
+# content hash of the upload, and memory-mapped read-only. Every session (and
+# every server process) that opens the same upload maps the same file, so its
+# columns occupy the page cache once instead of once per session. Sessions
+# hold a reference to the dataset they are looking at; a dataset is unmapped
+# and its file removed once it has had no references for idle_seconds.
+# Opening a dataset touches its file, so the files other processes are using
+# look recent to the sweep that removes abandoned ones.
+class DatasetStore:
+    def __init__(self, directory=STORE_DIR, idle_seconds=STORE_IDLE_SECONDS):
+        if not HAS_PYARROW:
+            raise ImportError("The dataset store requires pyarrow.")
+        self.directory = directory
+        self.idle_seconds = idle_seconds
+        self._entries = {}
+        self._held = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.directory, f"{digest}{STORE_SUFFIX}")
+
+    # The dataset as a memory-mapped Table, writing it with build() first if no
+    # session or process has yet. session takes a reference to it and drops
+    # the one it held on another dataset.
+    def acquire(self, digest, session, build):
+        with self._lock:
+            now = time.time()
+            previous = self._held.get(session)
+            if previous is not None and previous != digest and previous in self._entries:
+                self._entries[previous].sessions.pop(session, None)
+                self._entries[previous].last_used = now
+            self._held[session] = digest
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry.sessions[session] = now
+                entry.last_used = now
+        if entry is None:
+            entry = self._open(digest, build)
+            with self._lock:
+                entry = self._entries.setdefault(digest, entry)
+                entry.sessions[session] = time.time()
+        try:
+            os.utime(entry.path)
+        except FileNotFoundError:
+            pass
+        self.evict_idle()
+        return entry.table
+
+    def release(self, session):
+        with self._lock:
+            digest = self._held.pop(session, None)
+            if digest in self._entries:
+                self._entries[digest].sessions.pop(session, None)
+                self._entries[digest].last_used = time.time()
+
+    def references(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            return len(entry.sessions) if entry is not None else 0
+
+    def _open(self, digest, build):
+        import pyarrow as pa
+        import pyarrow.ipc
+
+        path = self.path(digest)
+        if not os.path.exists(path):
+            table = build()
+            # Written under a unique name and renamed into place, so concurrent
+            # writers of the same upload never expose a partial file
+            scratch = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with pa.OSFile(scratch, 'wb') as sink, pyarrow.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                os.replace(scratch, path)
+            finally:
+                if os.path.exists(scratch):
+                    os.remove(scratch)
+        table = pyarrow.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return _Entry(path, table)
+
+    # Drop references of sessions idle for longer than idle_seconds, then
+    # unmap and delete the datasets left without references for that long.
+    # Files are removed while mapped; mappings still in use stay valid.
+    def evict_idle(self):
+        cutoff = time.time() - self.idle_seconds
+        evicted = []
+        with self._lock:
+            for digest, entry in list(self._entries.items()):
+                for session, seen in list(entry.sessions.items()):
+                    if seen < cutoff:
+                        del entry.sessions[session]
+                        if self._held.get(session) == digest:
+                            del self._held[session]
+                        entry.last_used = max(entry.last_used, seen)
+                if not entry.sessions and entry.last_used < cutoff:
+                    evicted.append(self._entries.pop(digest).path)
+            open_paths = {entry.path for entry in self._entries.values()}
+        # Files left behind by earlier server runs or by processes that died
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path not in open_paths and path not in evicted:
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        evicted.append(path)
+                except FileNotFoundError:
+                    pass
+        for path in evicted:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(evicted)
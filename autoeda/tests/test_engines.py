@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import engines
+from benchmark_engines import OPERATIONS, _columns
+
+pytestmark = pytest.mark.skipif(not engines.HAS_ARROW_ENGINE, reason="the Arrow engine needs pyarrow")
+
+
+@pytest.fixture(scope='module')
+def small_csv(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    rows = 300
+    frame = pd.DataFrame({
+        'x': rng.normal(size=rows),
+        'y': rng.integers(0, 10, rows).astype(float),
+        'n': rng.integers(0, 5, rows),
+        'a': np.char.add('a', rng.integers(0, 3, rows).astype(str)),
+        'b': np.char.add('b', rng.integers(0, 4, rows).astype(str)),
+    })
+    frame.loc[::17, 'x'] = np.nan
+    # Repeat some rows so there are duplicates to find
+    frame = pd.concat([frame, frame.iloc[:20]], ignore_index=True)
+    path = tmp_path_factory.mktemp('engines') / 'small.csv'
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize('operation', ['describe', 'corr', 'crosstab', 'pivot_table', 'duplicated'])
+def test_arrow_engine_matches_pandas(small_csv, operation):
+    results = []
+    for name in ['pandas', 'arrow']:
+        engine = engines.get_engine(name)
+        frame = engine.read_csv(small_csv)
+        results.append(OPERATIONS[operation](engine, frame, _columns(engine.schema(frame))))
+    expected, result = results
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    else:
+        assert result == expected
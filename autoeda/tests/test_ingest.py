@@ -0,0 +1,48 @@
+import threading
+import time
+
+import numpy as np
+
+import ingest
+
+
+def test_parse_cache_caches_none():
+    cache = ingest.ParseCache(1024)
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_parse('key', lambda: calls.append(1)) is None
+    assert len(calls) == 1 and len(cache) == 1
+
+
+def test_parse_cache_evicts_least_recently_used_by_size():
+    cache = ingest.ParseCache(3 * 800)
+    for key in 'abc':
+        cache.put(key, np.zeros(100))
+    cache.get('a')
+    cache.put('d', np.zeros(100))
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    assert cache.used_bytes == 3 * 800
+    # A value over the whole budget is returned but not cached
+    cache.put('e', np.zeros(1000))
+    assert cache.get('e') is None and len(cache) == 3
+
+
+def test_parse_cache_parses_a_key_once_across_threads():
+    cache = ingest.ParseCache(1024 * 1024)
+    calls = []
+
+    def parse():
+        calls.append(1)
+        time.sleep(0.2)
+        return np.arange(10)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_parse('key', parse)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(results) == 8 and all(result is results[0] for result in results)
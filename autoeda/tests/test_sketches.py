@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+import accumulators
+from sketches import HyperLogLog, KLLSketch
+
+
+def _rank(values, x):
+    return np.searchsorted(np.sort(values), x, side='right') / len(values)
+
+
+def test_hyperloglog_error_within_bound():
+    values = pd.Series(np.arange(300_000) % 200_000)
+    sketch = HyperLogLog()
+    sketch.update(values)
+    result = sketch.result()
+    assert not result.exact
+    assert abs(result.value - 200_000) <= 4 * result.error
+
+
+def test_hyperloglog_small_cardinality():
+    sketch = HyperLogLog()
+    sketch.update(pd.Series(['a', 'b', 'c', 'a', None]))
+    assert sketch.result().value == 3
+
+
+def test_hyperloglog_merge_equals_sketch_of_union():
+    left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.update(pd.Series(np.arange(0, 60_000)))
+    right.update(pd.Series(np.arange(40_000, 100_000)))
+    union.update(pd.Series(np.arange(0, 100_000)))
+    left.merge(right)
+    np.testing.assert_array_equal(left.registers, union.registers)
+
+
+def test_kll_exact_below_limit():
+    values = np.random.default_rng(0).normal(size=1000)
+    sketch = KLLSketch(seed=0, exact_limit=1000)
+    sketch.update(values)
+    assert sketch.exact and sketch.rank_error == 0.0
+    np.testing.assert_allclose(sketch.quantiles([0.25, 0.5, 0.75]), np.quantile(values, [0.25, 0.5, 0.75]))
+
+
+def test_kll_rank_error_within_bound():
+    values = np.random.default_rng(1).lognormal(size=500_000)
+    sketch = KLLSketch(seed=0)
+    for start in range(0, len(values), 50_000):
+        sketch.update(values[start:start + 50_000])
+    assert not sketch.exact and sketch.n == len(values)
+    qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    for q, estimate in zip(qs, sketch.quantiles(qs)):
+        assert abs(_rank(values, estimate) - q) <= sketch.rank_error
+
+
+def test_kll_merge_within_bound():
+    values = np.random.default_rng(2).uniform(size=400_000)
+    left, right = KLLSketch(seed=0), KLLSketch(seed=1)
+    left.update(values[:150_000])
+    right.update(values[150_000:])
+    left.merge(right)
+    assert left.n == len(values)
+    qs = [0.1, 0.5, 0.9]
+    for q, estimate in zip(qs, left.quantiles(qs)):
+        assert abs(_rank(values, estimate) - q) <= left.rank_error
+
+
+def test_categorical_accumulator_switches_to_hyperloglog(monkeypatch):
+    monkeypatch.setattr(accumulators, 'STREAMING_EXACT_LIMIT', 1_000)
+    monkeypatch.setattr(accumulators, 'STREAMING_TOP_VALUES', 10)
+    acc = accumulators.CategoricalAccumulator()
+    values = pd.Series([f'id{i}' for i in range(20_000)] + ['common'] * 5_000)
+    for start in range(0, len(values), 2_500):
+        acc.update(values.iloc[start:start + 2_500])
+    estimate = acc.distinct_estimate()
+    assert not estimate.exact and estimate.error > 0
+    assert abs(estimate.value - 20_001) <= 4 * estimate.error
+    assert len(acc.counts) <= 10
+    assert acc.top()[0] == 'common'
+    assert 0 < acc.freq_error <= len(values) // 11
+    assert acc.top()[1] <= 5_000 <= acc.top()[1] + acc.freq_error
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from wordcloud import STOPWORDS, WordCloud
+
+TOKEN_PATTERN = r"\w[\w']*"
+TOKEN_CHUNK_ROWS = 50_000
+
+
+# Token counts for one chunk of text. Repeated texts are counted once and
+# weighted, which matters for categorical-looking columns.
+def _chunk_counts(values):
+    texts = values.dropna().astype(str).value_counts()
+    tokens = texts.index.to_series().str.findall(TOKEN_PATTERN)
+    weights = np.repeat(texts.to_numpy(), tokens.str.len().to_numpy())
+    tokens = tokens.explode().dropna()
+    if tokens.empty:
+        return pd.Series(dtype='int64')
+    tokens = tokens.str.replace(r"'[sS]$", '', regex=True)
+    counts = pd.Series(weights, index=tokens.to_numpy()).groupby(level=0).sum()
+    return counts[~counts.index.str.isdigit()]
+
+
+# Fold case variants into their most common spelling and merge simple plurals
+# into the singular, following WordCloud.process_text for single words.
+def _normalize(counts):
+    if counts.empty:
+        return pd.Series(dtype='int64')
+    counts = counts[~counts.index.str.lower().isin({word.lower() for word in STOPWORDS})]
+    if counts.empty:
+        return pd.Series(dtype='int64')
+    frame = pd.DataFrame({'word': counts.index, 'lower': counts.index.str.lower(), 'count': counts.to_numpy()})
+    totals = frame.groupby('lower')['count'].sum()
+    spelling = frame.sort_values('count', ascending=False).drop_duplicates('lower').set_index('lower')['word']
+
+    plural = totals.index.str.endswith('s') & ~totals.index.str.endswith('ss')
+    singular = pd.Index(totals.index[plural].str[:-1])
+    merge = singular.isin(totals.index)
+    plurals = totals.index[plural][merge]
+    totals = totals.add(pd.Series(totals[plurals].to_numpy(), index=singular[merge]), fill_value=0)
+    totals = totals.drop(plurals)
+    return pd.Series(totals.astype('int64').to_numpy(), index=spelling[totals.index].to_numpy()).sort_values(ascending=False)
+
+
+# Word frequencies for a text column built chunk by chunk, so no single
+# string the size of the column is ever created.
+def token_frequencies(values, chunk_rows=TOKEN_CHUNK_ROWS):
+    counts = pd.Series(dtype='int64')
+    for start in range(0, len(values), chunk_rows):
+        counts = counts.add(_chunk_counts(values.iloc[start:start + chunk_rows]), fill_value=0)
+    return _normalize(counts)
+
+
+def render_wordcloud(frequencies):
+    if frequencies.empty:
+        return None
+    wordcloud = WordCloud(background_color='white', width=800, height=640)
+    return wordcloud.generate_from_frequencies(frequencies.to_dict()).to_array()